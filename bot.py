@@ -1,4 +1,6 @@
 import os
+import time
+import asyncio
 import logging
 from dotenv import load_dotenv
 import discord
@@ -16,9 +18,33 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+# Imported after load_dotenv() because these modules read settings from the environment
+from utils.helpers import flush_pending_writes, log_sink
+from utils.name_index import name_index
+from utils.reactions import ReactionDispatcher
+from utils.dm_queue import DMQueue
+from utils.command_sync import sync_if_changed
+from utils.startup import StartupReport
+from utils.data_manager import AsyncDataManager, create_data_manager, shutdown_data_workers
+
 TOKEN = os.getenv("DISCORD_TOKEN")
+# Log a -X importtime summary of bot.py, utils/* and cogs/* before starting
+IMPORT_PROFILE = os.getenv("IMPORT_PROFILE", "").lower() in ("1", "true", "yes")
 OWNER = os.getenv("OWNER_USERNAME")
 GUILD_ID = os.getenv("GUILD_ID", None)
+# How much of the gateway state to keep in memory: full, standard or lean
+MEMORY_PROFILE = os.getenv("MEMORY_PROFILE", "standard").lower()
+
+# Extensions have no load-time dependencies on each other, so they load concurrently
+COGS = [
+    'cogs.admin',
+    'cogs.modules',
+    'cogs.events',
+    'cogs.utilities',
+    'cogs.moderation',
+    'cogs.reaction_roles',
+    'cogs.server_setup'
+]
 
 if not TOKEN:
     raise ValueError("DISCORD_TOKEN not found in environment variables")
@@ -26,18 +52,75 @@ if not OWNER:
     raise ValueError("OWNER_USERNAME not found in environment variables")
 
 
+def memory_profile_options(profile: str) -> dict:
+    """Intents and cache settings for a memory profile
+    
+    - full: every intent, all members chunked at startup, 1000 cached messages
+    - standard: no presences; only members who join or are in voice are cached, 1000 cached messages
+    - lean: only the intents the cogs use, no member or message cache; members are fetched on demand
+    """
+    if profile == "full":
+        intents = discord.Intents.all()
+        return {
+            'intents': intents,
+            'member_cache_flags': discord.MemberCacheFlags.from_intents(intents),
+            'chunk_guilds_at_startup': True,
+            'max_messages': 1000
+        }
+    
+    if profile == "standard":
+        # No cog reads presences, and they are the bulk of gateway traffic in large guilds
+        intents = discord.Intents.all()
+        intents.presences = False
+        return {
+            'intents': intents,
+            'member_cache_flags': discord.MemberCacheFlags.from_intents(intents),
+            'chunk_guilds_at_startup': False,
+            'max_messages': 1000
+        }
+    if profile == "lean":
+        # Guild, channel and role state, member lookups, prefix commands in guilds and DMs,
+        # and raw reactions; no typing, voice, invite, webhook, integration or scheduled event traffic
+        intents = discord.Intents(
+            guilds=True,
+            members=True,
+            guild_messages=True,
+            dm_messages=True,
+            message_content=True,
+            guild_reactions=True,
+            emojis_and_stickers=True
+        )
+        return {
+            'intents': intents,
+            'member_cache_flags': discord.MemberCacheFlags.none(),
+            'chunk_guilds_at_startup': False,
+            'max_messages': None
+        }
+    raise ValueError(f"Unknown MEMORY_PROFILE '{profile}' (expected full, standard or lean)")
+
+
 class UnisaBot(commands.Bot):
     """Custom bot class with initialization logic"""
     
     def __init__(self):
-        intents = discord.Intents.all()
+        # Created first so the login phase starts with the bot
+        self.startup = StartupReport()
+        # extension -> perf_counter() when its load started
+        self._load_started = {}
         super().__init__(
             command_prefix=self.get_prefix,
-            intents=intents,
             help_command=commands.DefaultHelpCommand(),
-            case_insensitive=True
+            case_insensitive=True,
+            **memory_profile_options(MEMORY_PROFILE)
         )
+        logger.info(f"Using the {MEMORY_PROFILE} memory profile")
         self.owner_username = OWNER
+        # Shared by every cog and permission check so caches stay consistent across !reload
+        self.dm = AsyncDataManager(create_data_manager())
+        # Cogs register the messages whose reactions they handle
+        self.reactions = ReactionDispatcher()
+        # Direct messages are queued here and delivered in the background
+        self.dms = DMQueue()
         
     async def get_prefix(self, message):
         """Allow both ! and mentions as prefix"""
@@ -45,40 +128,63 @@ class UnisaBot(commands.Bot):
     
     async def setup_hook(self):
         """Load all cogs and sync slash commands"""
-        cogs = [
-            'cogs.admin',
-            'cogs.modules',
-            'cogs.events',
-            'cogs.utilities',
-            'cogs.moderation',
-            'cogs.reaction_roles',
-            'cogs.server_setup'
-        ]
-
-        # Load all cogs
-        for cog in cogs:
-            try:
-                await self.load_extension(cog)
-                logger.info(f"Loaded {cog}")
-            except Exception as e:
-                logger.error(f"Failed to load {cog}: {e}")
-
-        # Sync slash commands to a test guild for instant registration
-        if GUILD_ID:
-            guild = discord.Object(id=GUILD_ID)
-            synced = await self.tree.sync(guild=guild)
+        self.startup.phase("login")
+        self.dms.start()
+
+        await asyncio.gather(*(self._load_cog(cog) for cog in COGS))
+        self.startup.extensions_loaded()
+
+        # Sync slash commands to a test guild for instant registration,
+        # skipped when the tree is unchanged since the last sync (!sync forces one)
+        guild = discord.Object(id=GUILD_ID) if GUILD_ID else None
+        synced = await sync_if_changed(self.tree, guild=guild)
+        if synced is None:
+            logger.info("Slash commands unchanged since last sync, skipping sync")
         else:
-            synced = await self.tree.sync()
-        logger.info(f"✅ Synced {len(synced)} slash commands to test guild")
+            logger.info(f"✅ Synced {len(synced)} slash commands to {'test guild' if guild else 'all guilds'}")
+        self.startup.phase("tree sync")
 
         self.log_commands()
 
+    async def _load_cog(self, cog):
+        """Load one extension, recording its import and setup time"""
+        self._load_started[cog] = time.perf_counter()
+        try:
+            await self.load_extension(cog)
+            timing = self.startup.extensions.setdefault(cog, {})
+            total = time.perf_counter() - self._load_started[cog]
+            timing.setdefault('import', total)
+            timing['setup'] = total - timing['import']
+            logger.info(f"Loaded {cog} (import {timing['import']:.2f}s, setup {timing['setup']:.2f}s)")
+        except Exception as e:
+            self.startup.failed[cog] = str(e)
+            logger.error(f"Failed to load {cog}: {e}")
+
+    async def add_cog(self, cog, /, **kwargs):
+        """Add a cog, marking the end of its extension's import"""
+        started = self._load_started.get(cog.__module__)
+        if started is not None and cog.__module__ not in self.startup.extensions:
+            # Everything up to here ran synchronously: module execution and the cog's constructor
+            self.startup.extensions[cog.__module__] = {'import': time.perf_counter() - started}
+        await super().add_cog(cog, **kwargs)
+
     
+    async def on_connect(self):
+        if not self.startup.ready:
+            self.startup.phase("gateway connect")
+
     async def on_ready(self):
         """Called when bot is ready"""
         logger.info(f"Logged in as {self.user} (ID: {self.user.id})")
         logger.info(f"Connected to {len(self.guilds)} guilds")
         
+        if not self.startup.ready:
+            self.startup.phase("guild availability")
+            self.startup.ready = True
+            logger.info("===== STARTUP TIMING =====")
+            for line in self.startup.summary():
+                logger.info(f"  {line}")
+        
         # Set bot status
         await self.change_presence(
             activity=discord.Activity(
@@ -87,6 +193,53 @@ class UnisaBot(commands.Bot):
             )
         )
 
+    async def on_raw_reaction_add(self, payload):
+        await self.reactions.dispatch(payload, True, self.user.id)
+
+    async def on_raw_reaction_remove(self, payload):
+        await self.reactions.dispatch(payload, False, self.user.id)
+
+    # ==================== NAME INDEX ====================
+
+    async def on_guild_available(self, guild):
+        """Index a guild's channels and roles and load its configured log channel"""
+        name_index.build(guild)
+        name_index.set_log_channel(guild.id, await self.dm.get_guild_config_value(guild.id, 'log_channel_id'))
+
+    async def on_guild_join(self, guild):
+        await self.on_guild_available(guild)
+
+    async def on_guild_remove(self, guild):
+        name_index.forget_guild(guild.id)
+
+    async def on_guild_channel_create(self, channel):
+        name_index.add(channel)
+
+    async def on_guild_channel_update(self, before, after):
+        name_index.rename(before, after)
+
+    async def on_guild_channel_delete(self, channel):
+        name_index.remove(channel)
+
+    async def on_guild_role_create(self, role):
+        name_index.add(role)
+
+    async def on_guild_role_update(self, before, after):
+        name_index.rename(before, after)
+
+    async def on_guild_role_delete(self, role):
+        name_index.remove(role)
+
+    async def close(self):
+        """Finish queued DMs, log entries and data operations and flush deferred writes before disconnecting"""
+        await self.dms.stop()
+        await log_sink.close()
+        await asyncio.to_thread(shutdown_data_workers)
+        flushed = flush_pending_writes()
+        if flushed:
+            logger.info(f"Flushed {flushed} pending data files")
+        await super().close()
+
     def log_commands(self):
         """Log all loaded prefix and slash commands"""
 
@@ -137,6 +290,15 @@ class UnisaBot(commands.Bot):
 
 def main():
     """Main entry point"""
+    if IMPORT_PROFILE:
+        from utils.import_profile import profile_imports
+        try:
+            logger.info("===== IMPORT PROFILE =====")
+            for line in profile_imports():
+                logger.info(line)
+        except Exception as e:
+            logger.error(f"Import profile failed: {e}")
+    
     bot = UnisaBot()
     
     try:
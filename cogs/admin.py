@@ -1,10 +1,11 @@
 import discord
 from discord.ext import commands
-from utils.data_manager import DataManager
-from utils.helpers import is_owner, is_admin, log_action, send_embed
+from utils.helpers import is_owner, is_admin, log_action, send_embed, flush_pending_writes
+from utils.command_sync import sync_tree
 from discord import app_commands
 from discord import Object, Color, Interaction, TextChannel
 from datetime import datetime
+from typing import Union
 
 
 def _parse_fields(raw: str | None) -> list[tuple[str, str]]:
@@ -35,43 +36,43 @@ class Admin(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
-        self.dm = DataManager()
+        self.dm = bot.dm
     
     @commands.command(name="addadmin")
     @is_owner()
-    async def add_admin(self, ctx, *, username: str):
+    async def add_admin(self, ctx, *, user: discord.User):
         """Add a bot administrator (Owner only)
         
-        Usage: !addadmin username#1234
+        Usage: !addadmin @user
         """
-        if self.dm.add_admin(username):
+        if await self.dm.add_admin(user.id):
             await send_embed(
                 ctx,
                 title="✅ Admin Added",
-                description=f"**{username}** is now a bot administrator.",
+                description=f"**{user}** is now a bot administrator.",
                 color=discord.Color.green()
             )
             await log_action(
                 ctx.guild,
-                f"✅ {ctx.author.mention} added **{username}** as admin",
+                f"✅ {ctx.author.mention} added {user.mention} as admin",
                 discord.Color.green()
             )
         else:
             await send_embed(
                 ctx,
                 title="⚠️ Already Admin",
-                description=f"**{username}** is already an administrator.",
+                description=f"**{user}** is already an administrator.",
                 color=discord.Color.orange()
             )
     
     @commands.command(name="removeadmin")
     @is_owner()
-    async def remove_admin(self, ctx, *, username: str):
+    async def remove_admin(self, ctx, *, user: Union[discord.User, str]):
         """Remove a bot administrator (Owner only)
         
-        Usage: !removeadmin username#1234
+        Usage: !removeadmin @user
         """
-        if username == self.bot.owner_username:
+        if str(user) == self.bot.owner_username:
             await send_embed(
                 ctx,
                 title="❌ Cannot Remove Owner",
@@ -80,23 +81,26 @@ class Admin(commands.Cog):
             )
             return
         
-        if self.dm.remove_admin(username):
+        # Users are stored by ID; plain names are legacy entries not yet linked to an ID
+        entry = user if isinstance(user, str) else user.id
+        
+        if await self.dm.remove_admin(entry):
             await send_embed(
                 ctx,
                 title="✅ Admin Removed",
-                description=f"**{username}** is no longer a bot administrator.",
+                description=f"**{user}** is no longer a bot administrator.",
                 color=discord.Color.green()
             )
             await log_action(
                 ctx.guild,
-                f"❌ {ctx.author.mention} removed **{username}** as admin",
+                f"❌ {ctx.author.mention} removed **{user}** as admin",
                 discord.Color.orange()
             )
         else:
             await send_embed(
                 ctx,
                 title="⚠️ Not Found",
-                description=f"**{username}** is not an administrator.",
+                description=f"**{user}** is not an administrator.",
                 color=discord.Color.orange()
             )
 
@@ -178,9 +182,12 @@ class Admin(commands.Cog):
         
         Usage: !listadmins
         """
-        admins = self.dm.get_admins()
+        admins = await self.dm.get_admins()
         
-        admin_list = "\n".join(f"• {admin}" for admin in admins)
+        admin_list = "\n".join(
+            f"• <@{admin}>" if isinstance(admin, int) else f"• {admin} *(not yet linked)*"
+            for admin in admins
+        )
         
         await send_embed(
             ctx,
@@ -195,16 +202,15 @@ class Admin(commands.Cog):
     async def sync_commands(self, ctx, guild_id: int = None):
         """Sync application commands (Owner only)
         
+        Always syncs, even if the commands are unchanged since the last sync.
+        
         Usage: !sync [guild_id]
         """
         await ctx.send("🔄 Syncing commands...")
 
         try:
-            if guild_id:
-                guild = Object(id=guild_id)
-                synced = await self.bot.tree.sync(guild=guild)
-            else:
-                synced = await self.bot.tree.sync()
+            guild = Object(id=guild_id) if guild_id else None
+            synced = await sync_tree(self.bot.tree, guild=guild)
 
             await send_embed(
                 ctx,
@@ -220,6 +226,76 @@ class Admin(commands.Cog):
                 color=Color.red()
             )
     
+    @commands.command(name="reactionstats")
+    @is_owner()
+    async def reaction_stats(self, ctx):
+        """Show how raw reaction events were routed (Owner only)
+        
+        Usage: !reactionstats
+        """
+        reactions = self.bot.reactions
+        await send_embed(
+            ctx,
+            title="📊 Reaction Dispatcher",
+            fields=[
+                {'name': 'Routed', 'value': str(reactions.stats['routed']), 'inline': True},
+                {'name': 'Dropped', 'value': str(reactions.stats['dropped']), 'inline': True},
+                {'name': 'Own', 'value': str(reactions.stats['own']), 'inline': True},
+                {'name': 'Registered Messages', 'value': str(reactions.routes), 'inline': True}
+            ],
+            color=discord.Color.blue()
+        )
+    
+    @commands.command(name="dmstats")
+    @is_owner()
+    async def dm_stats(self, ctx):
+        """Show direct message queue metrics (Owner only)
+        
+        Usage: !dmstats
+        """
+        dms = self.bot.dms
+        await send_embed(
+            ctx,
+            title="📬 DM Queue",
+            fields=[
+                {'name': 'Backlog', 'value': str(dms.backlog), 'inline': True},
+                {'name': 'Sent', 'value': str(dms.stats['sent']), 'inline': True},
+                {'name': 'Failed', 'value': str(dms.stats['failed']), 'inline': True},
+                {'name': 'DMs Closed', 'value': f"{dms.stats['forbidden']} ({dms.closed} skipped for now)", 'inline': True},
+                {'name': 'Skipped', 'value': str(dms.stats['skipped']), 'inline': True},
+                {'name': 'Merged / Duplicates', 'value': f"{dms.stats['merged']} / {dms.stats['deduplicated']}", 'inline': True}
+            ],
+            color=discord.Color.blue()
+        )
+
+    @commands.command(name="startup")
+    @is_owner()
+    async def startup_report(self, ctx):
+        """Show how long each startup phase and extension took (Owner only)
+
+        Usage: !startup
+        """
+        report = self.bot.startup
+        phases = "\n".join(f"{name}: **{seconds:.2f}s**" for name, seconds in report.phases.items())
+        extensions = "\n".join(
+            f"`{name}` import {timing.get('import', 0):.2f}s, setup {timing.get('setup', 0):.2f}s"
+            for name, timing in sorted(report.extensions.items(), key=lambda item: -sum(item[1].values()))
+        )
+        fields = [
+            {'name': 'Phases', 'value': phases or "None recorded", 'inline': False},
+            {'name': 'Extensions (slowest first)', 'value': extensions or "None loaded", 'inline': False}
+        ]
+        if report.failed:
+            fields.append({'name': 'Failed', 'value': "\n".join(f"`{name}`: {error}" for name, error in report.failed.items())[:1024], 'inline': False})
+
+        await send_embed(
+            ctx,
+            title="⏱️ Startup Timing",
+            description=f"Time to ready: **{report.total:.2f}s**" if report.ready else "Still starting up",
+            fields=fields,
+            color=discord.Color.blue()
+        )
+
     @commands.command(name="reload")
     @is_owner()
     async def reload_cog(self, ctx, cog_name: str):
@@ -337,6 +413,7 @@ class Admin(commands.Cog):
             f"🔴 Bot shutdown by {ctx.author.mention}",
             discord.Color.red()
         )
+        flush_pending_writes()
         await self.bot.close()
 
 
@@ -1,8 +1,8 @@
 import discord
-from discord.ext import commands, tasks
-from datetime import datetime, timedelta
-from utils.data_manager import DataManager
-from utils.helpers import is_admin, log_action, send_embed, format_list
+from discord.ext import commands
+from datetime import datetime, date, timedelta
+from utils.helpers import is_admin, log_action, send_embed, format_list, get_channel_by_name
+from utils.reminders import ReminderScheduler, reminder_heading
 
 
 class Events(commands.Cog):
@@ -10,11 +10,19 @@ class Events(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
-        self.dm = DataManager()
-        self.reminder_task.start()
+        self.dm = bot.dm
+        self.scheduler = ReminderScheduler(bot, self.send_reminders)
+    
+    async def cog_load(self):
+        self.scheduler.start()
     
     def cog_unload(self):
-        self.reminder_task.cancel()
+        self.scheduler.stop()
+    
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild):
+        """Schedule reminders for a newly joined guild"""
+        await self.scheduler.rebuild()
     
     @commands.command(name="addevent")
     @is_admin()
@@ -39,7 +47,7 @@ class Events(commands.Cog):
             return
         
         # Check if module exists
-        if not self.dm.module_exists(module):
+        if not await self.dm.module_exists(module):
             await send_embed(
                 ctx,
                 title="⚠️ Warning",
@@ -48,7 +56,12 @@ class Events(commands.Cog):
             )
         
         # Add event
-        event_key = self.dm.add_event(module, date, description)
+        event_key = await self.dm.add_event(module, date, description)
+        self.scheduler.schedule_event(
+            event_key,
+            {'module': module, 'date': date, 'description': description},
+            event_date.date()
+        )
         
         await send_embed(
             ctx,
@@ -73,7 +86,7 @@ class Events(commands.Cog):
         
         Usage: !events [module]
         """
-        events = self.dm.get_events(module)
+        events = await self.dm.get_events_sorted(module)
         
         if not events:
             msg = f"No events found for **{module.upper()}**." if module else "No events scheduled."
@@ -85,37 +98,30 @@ class Events(commands.Cog):
             )
             return
         
-        # Sort by date
-        sorted_events = sorted(
-            events.items(),
-            key=lambda x: x[1].get('date', '9999-99-99')
-        )
-        
-        # Group by upcoming/past
-        now = datetime.now()
+        # Group by upcoming/past (events arrive in date order)
+        today = date.today()
         upcoming = []
         past = []
         
-        for key, event in sorted_events:
-            try:
-                event_date = datetime.strptime(event['date'], "%Y-%m-%d")
-                days_until = (event_date - now).days
-                
-                event_str = f"**{event['module']}** - {event['date']}\n{event['description']}"
-                
-                if days_until >= 0:
-                    if days_until == 0:
-                        event_str += " 🔴 **TODAY**"
-                    elif days_until <= 7:
-                        event_str += f" ⚠️ **{days_until} days**"
-                    else:
-                        event_str += f" ({days_until} days)"
-                    upcoming.append(event_str)
+        for key, event, event_date in events:
+            event_str = f"**{event['module']}** - {event['date']}\n{event['description']}"
+            
+            if event_date is None:
+                upcoming.append(event_str)
+                continue
+            
+            days_until = (event_date - today).days
+            
+            if days_until >= 0:
+                if days_until == 0:
+                    event_str += " 🔴 **TODAY**"
+                elif days_until <= 7:
+                    event_str += f" ⚠️ **{days_until} days**"
                 else:
-                    past.append(event_str)
-                    
-            except ValueError:
-                upcoming.append(f"**{event['module']}** - {event['date']}\n{event['description']}")
+                    event_str += f" ({days_until} days)"
+                upcoming.append(event_str)
+            else:
+                past.append(event_str)
         
         fields = []
         
@@ -151,7 +157,7 @@ class Events(commands.Cog):
         Usage: !delevent COS1501 2024-06-15
         """
         module = module.upper()
-        event_key = self.dm.find_event(module, date)
+        event_key = await self.dm.find_event(module, date)
         
         if not event_key:
             await send_embed(
@@ -162,7 +168,8 @@ class Events(commands.Cog):
             )
             return
         
-        if self.dm.remove_event(event_key):
+        if await self.dm.remove_event(event_key):
+            self.scheduler.unschedule_event(event_key)
             await send_embed(
                 ctx,
                 title="✅ Event Deleted",
@@ -198,34 +205,24 @@ class Events(commands.Cog):
             )
             return
         
-        all_events = self.dm.get_events()
-        now = datetime.now()
-        cutoff = now + timedelta(days=days)
+        today = date.today()
+        events = await self.dm.get_events_between(today, today + timedelta(days=days))
         
         upcoming = []
-        for key, event in all_events.items():
-            try:
-                event_date = datetime.strptime(event['date'], "%Y-%m-%d")
-                
-                if now <= event_date <= cutoff:
-                    days_until = (event_date - now).days
-                    
-                    urgency = ""
-                    if days_until == 0:
-                        urgency = " 🔴 **TODAY**"
-                    elif days_until == 1:
-                        urgency = " ⚠️ **TOMORROW**"
-                    elif days_until <= 3:
-                        urgency = f" ⚠️ **{days_until} days**"
-                    else:
-                        urgency = f" ({days_until} days)"
-                    
-                    upcoming.append({
-                        'date': event_date,
-                        'text': f"**{event['module']}** - {event['date']}{urgency}\n{event['description']}"
-                    })
-            except ValueError:
-                continue
+        for key, event, event_date in events:
+            days_until = (event_date - today).days
+            
+            urgency = ""
+            if days_until == 0:
+                urgency = " 🔴 **TODAY**"
+            elif days_until == 1:
+                urgency = " ⚠️ **TOMORROW**"
+            elif days_until <= 3:
+                urgency = f" ⚠️ **{days_until} days**"
+            else:
+                urgency = f" ({days_until} days)"
+            
+            upcoming.append(f"**{event['module']}** - {event['date']}{urgency}\n{event['description']}")
         
         if not upcoming:
             await send_embed(
@@ -236,10 +233,7 @@ class Events(commands.Cog):
             )
             return
         
-        # Sort by date
-        upcoming.sort(key=lambda x: x['date'])
-        
-        event_list = '\n\n'.join([e['text'] for e in upcoming])
+        event_list = '\n\n'.join(upcoming)
         
         await send_embed(
             ctx,
@@ -249,59 +243,53 @@ class Events(commands.Cog):
             footer=f"{len(upcoming)} upcoming events"
         )
     
-    @tasks.loop(hours=24)
-    async def reminder_task(self):
-        """Daily task to send event reminders"""
-        now = datetime.now()
+    @commands.command(name="reminders")
+    @is_admin()
+    async def reminder_settings(self, ctx, *offsets: int):
+        """Show or set how many days before events reminders are sent
         
-        for guild in self.bot.guilds:
-            announcements = discord.utils.get(guild.text_channels, name="announcements")
-            if not announcements:
-                continue
-            
-            all_events = self.dm.get_events()
-            today_events = []
-            tomorrow_events = []
-            week_events = []
-            
-            for key, event in all_events.items():
-                try:
-                    event_date = datetime.strptime(event['date'], "%Y-%m-%d")
-                    days_until = (event_date - now).days
-                    
-                    if days_until == 0:
-                        today_events.append(event)
-                    elif days_until == 1:
-                        tomorrow_events.append(event)
-                    elif days_until == 7:
-                        week_events.append(event)
-                        
-                except ValueError:
-                    continue
-            
-            # Send reminders
-            if today_events:
-                events_text = '\n'.join([f"• **{e['module']}**: {e['description']}" for e in today_events])
-                await announcements.send(
-                    f"🔴 **Events TODAY:**\n{events_text}"
-                )
-            
-            if tomorrow_events:
-                events_text = '\n'.join([f"• **{e['module']}**: {e['description']}" for e in tomorrow_events])
-                await announcements.send(
-                    f"⚠️ **Events TOMORROW:**\n{events_text}"
-                )
-            
-            if week_events:
-                events_text = '\n'.join([f"• **{e['module']}**: {e['description']}" for e in week_events])
-                await announcements.send(
-                    f"📅 **Events in 1 week:**\n{events_text}"
-                )
+        Usage: !reminders [days...]
+        Example: !reminders 7 1 0
+        """
+        if not offsets:
+            current = await self.dm.get_guild_config_value(ctx.guild.id, 'reminder_offsets')
+            await send_embed(
+                ctx,
+                title="⏰ Event Reminders",
+                description=f"Reminders are sent **{', '.join(map(str, current or [7, 1, 0]))}** days before events.",
+                color=discord.Color.blue(),
+                footer=f"{self.scheduler.pending} reminders scheduled"
+            )
+            return
+        
+        if any(offset < 0 or offset > 60 for offset in offsets):
+            await send_embed(
+                ctx,
+                title="❌ Invalid Offsets",
+                description="Days must be between 0 and 60.",
+                color=discord.Color.red()
+            )
+            return
+        
+        offsets = sorted(set(offsets), reverse=True)
+        await self.scheduler.set_offsets(ctx.guild.id, offsets)
+        
+        await send_embed(
+            ctx,
+            title="✅ Reminders Updated",
+            description=f"Reminders will be sent **{', '.join(map(str, offsets))}** days before events.",
+            color=discord.Color.green()
+        )
     
-    @reminder_task.before_loop
-    async def before_reminder_task(self):
-        """Wait until bot is ready"""
-        await self.bot.wait_until_ready()
+    async def send_reminders(self, guild: discord.Guild, offset: int, events: list) -> bool:
+        """Post a batch of reminders to a guild's announcements channel"""
+        announcements = get_channel_by_name(guild, "announcements")
+        if not announcements:
+            return False
+        
+        events_text = '\n'.join([f"• **{e['module']}**: {e['description']}" for e in events])
+        await announcements.send(f"{reminder_heading(offset)}\n{events_text}")
+        return True
 
 
 async def setup(bot):
@@ -1,6 +1,7 @@
 import discord
 from discord.ext import commands
 from utils.helpers import is_admin, log_action, send_embed
+from utils.server_template import ServerTemplate, load_template, format_plan
 
 
 class Moderation(commands.Cog):
@@ -11,148 +12,91 @@ class Moderation(commands.Cog):
     
     @commands.command(name="setrules")
     @is_admin()
-    async def setup_server(self, ctx):
+    async def setup_server(self, ctx, mode: str = None):
         """Initialize server with channels and categories
         
-        Usage: !setrules
+        Follows templates/community.json and only creates or fixes what differs.
+        
+        Usage: !setrules [plan]
         """
         guild = ctx.guild
+        template = ServerTemplate(guild, load_template("community"))
+        steps = template.plan()
+        
+        if mode == "plan":
+            await send_embed(
+                ctx,
+                title="📋 Server Setup Plan",
+                description=format_plan(steps),
+                color=discord.Color.blue(),
+                footer=f"{len(steps)} changes • Run !setrules to apply"
+            )
+            return
         
         await ctx.send("🔄 Setting up server structure...")
         
         try:
-            # Create Community Hub
-            hub = await guild.create_category("📚 Community Hub")
-            
-            await guild.create_text_channel(
-                "welcome",
-                category=hub,
-                topic="Welcome to UNISA BSc Community!"
-            )
-            
-            rules_channel = await guild.create_text_channel(
-                "rules",
-                category=hub,
-                topic="Server rules and guidelines"
-            )
-            
-            await guild.create_text_channel(
-                "announcements",
-                category=hub,
-                topic="Important announcements"
-            )
-            
-            await guild.create_text_channel(
-                "general-chat",
-                category=hub,
-                topic="General discussion"
-            )
-            
-            await guild.create_text_channel(
-                "faq",
-                category=hub,
-                topic="Frequently asked questions"
-            )
-            
-            await guild.create_text_channel(
-                "events-schedule",
-                category=hub,
-                topic="Upcoming events and deadlines"
-            )
-            
-            # Voice channels
-            await guild.create_voice_channel("📞 Study Lobby", category=hub)
-            await guild.create_voice_channel("🔇 Quiet Study", category=hub)
-            
-            # Study Spaces
-            study = await guild.create_category("📖 Study Spaces")
-            
-            await guild.create_text_channel(
-                "group-finder",
-                category=study,
-                topic="Find study partners"
-            )
-            
-            await guild.create_text_channel(
-                "exam-prep",
-                category=study,
-                topic="Exam preparation and tips"
-            )
-            
-            await guild.create_text_channel(
-                "math-help",
-                category=study,
-                topic="Mathematics help and discussion"
-            )
-            
-            await guild.create_text_channel(
-                "programming-help",
-                category=study,
-                topic="Programming help and code review"
-            )
-            
-            # Study voice rooms
-            for i in range(1, 4):
-                await guild.create_voice_channel(
-                    f"📚 Study Room {i}",
-                    category=study
-                )
+            objects = await template.apply(steps)
+            created = [step for step in steps if step.action == "create"]
+            rules_channel = objects["rules"]
             
             # Post rules
-            rules_embed = discord.Embed(
-                title="📜 UNISA BSc Community Rules",
-                description="Please read and follow these rules to maintain a positive learning environment.",
-                color=discord.Color.blue()
-            )
+            if any(step.name == "rules" for step in created):
+                rules_embed = discord.Embed(
+                    title="📜 UNISA BSc Community Rules",
+                    description="Please read and follow these rules to maintain a positive learning environment.",
+                    color=discord.Color.blue()
+                )
             
-            rules_embed.add_field(
-                name="1️⃣ Be Respectful",
-                value="Treat all members with respect. No harassment, hate speech, or discrimination.",
-                inline=False
-            )
+                rules_embed.add_field(
+                    name="1️⃣ Be Respectful",
+                    value="Treat all members with respect. No harassment, hate speech, or discrimination.",
+                    inline=False
+                )
             
-            rules_embed.add_field(
-                name="2️⃣ Academic Integrity",
-                value="No cheating or sharing of exam answers. Help each other learn, don't just give answers.",
-                inline=False
-            )
+                rules_embed.add_field(
+                    name="2️⃣ Academic Integrity",
+                    value="No cheating or sharing of exam answers. Help each other learn, don't just give answers.",
+                    inline=False
+                )
             
-            rules_embed.add_field(
-                name="3️⃣ No Spam",
-                value="Keep conversations relevant. No excessive advertisements or self-promotion.",
-                inline=False
-            )
+                rules_embed.add_field(
+                    name="3️⃣ No Spam",
+                    value="Keep conversations relevant. No excessive advertisements or self-promotion.",
+                    inline=False
+                )
             
-            rules_embed.add_field(
-                name="4️⃣ Stay On Topic",
-                value="Use module channels for module-specific discussions. Use general channels for everything else.",
-                inline=False
-            )
+                rules_embed.add_field(
+                    name="4️⃣ Stay On Topic",
+                    value="Use module channels for module-specific discussions. Use general channels for everything else.",
+                    inline=False
+                )
             
-            rules_embed.add_field(
-                name="5️⃣ Use Study Rooms Responsibly",
-                value="Voice channels are for studying and collaboration. Keep noise levels appropriate.",
-                inline=False
-            )
+                rules_embed.add_field(
+                    name="5️⃣ Use Study Rooms Responsibly",
+                    value="Voice channels are for studying and collaboration. Keep noise levels appropriate.",
+                    inline=False
+                )
             
-            rules_embed.add_field(
-                name="6️⃣ Ask Questions",
-                value="Don't hesitate to ask for help! We're all here to learn together.",
-                inline=False
-            )
+                rules_embed.add_field(
+                    name="6️⃣ Ask Questions",
+                    value="Don't hesitate to ask for help! We're all here to learn together.",
+                    inline=False
+                )
             
-            rules_embed.set_footer(text="Last updated: " + discord.utils.utcnow().strftime("%Y-%m-%d"))
+                rules_embed.set_footer(text="Last updated: " + discord.utils.utcnow().strftime("%Y-%m-%d"))
             
-            await rules_channel.send(embed=rules_embed)
+                await rules_channel.send(embed=rules_embed)
             
             await send_embed(
                 ctx,
                 title="✅ Server Initialized",
-                description="Server structure has been created successfully!",
+                description="Server structure has been created successfully!" if steps else "Server structure is already up to date.",
                 fields=[
-                    {'name': 'Categories', 'value': '2', 'inline': True},
-                    {'name': 'Text Channels', 'value': '10', 'inline': True},
-                    {'name': 'Voice Channels', 'value': '5', 'inline': True}
+                    {'name': 'Categories', 'value': str(sum(step.kind == "category" for step in created)), 'inline': True},
+                    {'name': 'Text Channels', 'value': str(sum(step.kind == "text" for step in created)), 'inline': True},
+                    {'name': 'Voice Channels', 'value': str(sum(step.kind == "voice" for step in created)), 'inline': True},
+                    {'name': 'Updated', 'value': str(len(steps) - len(created)), 'inline': True}
                 ],
                 color=discord.Color.green()
             )
@@ -1,18 +1,37 @@
+import copy
+import asyncio
+import fnmatch
 import discord
 from discord.ext import commands
 from datetime import datetime
-from utils.data_manager import DataManager
+from typing import Dict, List, Tuple, Callable, Awaitable, Optional
 from utils.helpers import is_admin, log_action, send_embed, format_list
+from utils.rate_limit import rate_limiter, StepTimer
+from utils.provisioning import parse_module_list
 from discord import app_commands
 from discord import Object, Color, Interaction
 
 
+# Channels created for every new module unless a guild sets its own `module_template`
+DEFAULT_MODULE_TEMPLATE = {
+    'text': [
+        ["general", "General discussion"],
+        ["resources", "Study materials and resources"],
+        ["schedule", "Assignment and exam schedules"],
+        ["questions", "Ask questions and get help"]
+    ],
+    'voice': ["study-room1", "study-room2", "study-room3"]
+}
+# Modules a bulk run builds at once; each pipelines role -> category -> channels
+BULK_MODULE_CONCURRENCY = 4
+
+
 class Modules(commands.Cog):
     """Module creation and management commands"""
     
     def __init__(self, bot):
         self.bot = bot
-        self.dm = DataManager()
+        self.dm = bot.dm
     
     @commands.command(name="createmod", aliases=["addmodule"])
     @is_admin()
@@ -23,7 +42,7 @@ class Modules(commands.Cog):
         """
         code = code.upper()
         
-        if self.dm.module_exists(code):
+        if await self.dm.module_exists(code):
             await send_embed(
                 ctx,
                 title="⚠️ Module Exists",
@@ -36,15 +55,18 @@ class Modules(commands.Cog):
         await ctx.send(f"🔄 Creating module **{code}**...")
         
         try:
-            role = await self._create_module_role(ctx.guild, code)
-            category = await self._create_module_category(ctx.guild, code, role)
+            timer = StepTimer()
+            async with timer.step("role"):
+                role = await self._create_module_role(ctx.guild, code)
+            category = await self._create_module_category(ctx.guild, code, role, timer=timer)
             
             # Save to database
-            self.dm.add_module(code, {
-                'name': name or code,
-                'role_id': role.id,
-                'category_id': category.id
-            })
+            async with timer.step("save"):
+                await self.dm.add_module(code, {
+                    'name': name or code,
+                    'role_id': role.id,
+                    'category_id': category.id
+                })
             
             await send_embed(
                 ctx,
@@ -53,7 +75,8 @@ class Modules(commands.Cog):
                 fields=[
                     {'name': 'Role', 'value': role.mention, 'inline': True},
                     {'name': 'Category', 'value': category.name, 'inline': True},
-                    {'name': 'Channels', 'value': f"{len(category.channels)} created", 'inline': True}
+                    {'name': 'Channels', 'value': f"{len(category.channels)} created", 'inline': True},
+                    {'name': 'Timings', 'value': timer.summary(), 'inline': False}
                 ],
                 color=discord.Color.green()
             )
@@ -81,63 +104,280 @@ class Modules(commands.Cog):
     
     async def _create_module_role(self, guild: discord.Guild, code: str) -> discord.Role:
         """Create a role for the module"""
-        return await guild.create_role(
+        return await rate_limiter.call(
+            ("roles", guild.id),
+            guild.create_role,
             name=code,
             color=discord.Color.random(),
             mentionable=True,
             reason=f"Module role for {code}"
         )
     
+    async def get_module_template(self, guild_id: int) -> Dict[str, list]:
+        """Get the channel layout used for new modules in a guild"""
+        template = await self.dm.get_guild_config_value(guild_id, 'module_template')
+        return template or DEFAULT_MODULE_TEMPLATE
+    
     async def _create_module_category(
         self, 
         guild: discord.Guild, 
         code: str, 
-        role: discord.Role
+        role: discord.Role,
+        template: Dict[str, list] = None,
+        timer: StepTimer = None
     ) -> discord.CategoryChannel:
         """Create category with channels for the module"""
-        # Create category
-        category = await guild.create_category(
-            code,
-            reason=f"Module category for {code}"
-        )
+        template = template or await self.get_module_template(guild.id)
+        timer = timer or StepTimer()
         
-        # Set permissions
-        await category.set_permissions(
-            role,
-            view_channel=True,
-            send_messages=True,
-            read_message_history=True
-        )
-        await category.set_permissions(
-            guild.default_role,
-            view_channel=False
-        )
+        category = await self._create_empty_module_category(guild, code, role, timer)
+        await self._create_module_channels(guild, code, category, template, timer)
+        return category
+    
+    async def _create_empty_module_category(
+        self,
+        guild: discord.Guild,
+        code: str,
+        role: discord.Role,
+        timer: StepTimer = None
+    ) -> discord.CategoryChannel:
+        """Create an empty module category visible only to the module role"""
+        timer = timer or StepTimer()
         
-        # Create text channels
-        channels = [
-            ("general", "General discussion"),
-            ("resources", "Study materials and resources"),
-            ("schedule", "Assignment and exam schedules"),
-            ("questions", "Ask questions and get help")
-        ]
+        # Create category with its permissions in the same call
+        async with timer.step("category"):
+            category = await rate_limiter.call(
+                ("channels", guild.id),
+                guild.create_category,
+                code,
+                overwrites={
+                    guild.default_role: discord.PermissionOverwrite(view_channel=False),
+                    role: discord.PermissionOverwrite(
+                        view_channel=True,
+                        send_messages=True,
+                        read_message_history=True
+                    )
+                },
+                reason=f"Module category for {code}"
+            )
+        return category
+    
+    async def _create_module_channels(
+        self,
+        guild: discord.Guild,
+        code: str,
+        category: discord.CategoryChannel,
+        template: Dict[str, list],
+        timer: StepTimer = None
+    ):
+        """Create the template channels a module category doesn't have yet"""
+        timer = timer or StepTimer()
+        existing_text = {channel.name for channel in category.text_channels}
+        existing_voice = {channel.name for channel in category.voice_channels}
         
-        for channel_name, topic in channels:
-            await guild.create_text_channel(
+        # Channels inherit the category permissions, so they can all be created at once
+        bucket = ("channels", guild.id)
+        creations = []
+        for position, (channel_name, topic) in enumerate(template['text']):
+            if channel_name in existing_text:
+                continue
+            creations.append(rate_limiter.call(
+                bucket,
+                guild.create_text_channel,
                 channel_name,
                 category=category,
                 topic=topic,
+                position=position,
                 reason=f"Module channel for {code}"
-            )
+            ))
         
-        # Create voice channels
-        for i in range(1, 4):
-            await guild.create_voice_channel(
-                f"study-room{i}",
+        for position, channel_name in enumerate(template['voice'], start=len(template['text'])):
+            if channel_name in existing_voice:
+                continue
+            creations.append(rate_limiter.call(
+                bucket,
+                guild.create_voice_channel,
+                channel_name,
                 category=category,
+                position=position,
                 reason=f"Study voice channel for {code}"
+            ))
+        
+        async with timer.step(f"{len(creations)} channels"):
+            await asyncio.gather(*creations)
+    
+    async def provision_modules(
+        self,
+        guild: discord.Guild,
+        entries: List[Tuple[str, str]] = None,
+        progress: Optional[Callable[[int, int, str], Awaitable[None]]] = None
+    ) -> Dict[str, List[str]]:
+        """Create many modules, recording progress so an interrupted run can resume
+        
+        Entries are (code, name) pairs added to the guild's unfinished run, if any.
+        Finished modules are saved with a single write at the end.
+        """
+        def queue(config):
+            run = config.setdefault('module_provisioning', {})
+            for code, name in entries or []:
+                run.setdefault(code.upper(), {'name': name or code.upper()})
+            return copy.deepcopy(run)
+        
+        run = await self.dm.modify_guild_config(guild.id, queue)
+        existing = await self.dm.get_modules()
+        template = await self.get_module_template(guild.id)
+        
+        results = {'created': [], 'skipped': [code for code in run if code in existing], 'failed': []}
+        pending = {code: state for code, state in run.items() if code not in existing}
+        finished: Dict[str, Dict[str, int]] = {}
+        slots = asyncio.Semaphore(BULK_MODULE_CONCURRENCY)
+        
+        async def record(code: str, **values):
+            def apply(config):
+                config.setdefault('module_provisioning', {}).setdefault(code, {}).update(values)
+            await self.dm.modify_guild_config(guild.id, apply)
+        
+        async def build(code: str, state: Dict[str, int]):
+            async with slots:
+                try:
+                    # Reuse whatever an interrupted run already created
+                    role = guild.get_role(state.get('role_id', 0))
+                    if not role:
+                        role = await self._create_module_role(guild, code)
+                        await record(code, role_id=role.id)
+                    
+                    # The category is recorded before its channels, so a resumed run
+                    # fills in the missing channels instead of creating a second category
+                    category = guild.get_channel(state.get('category_id', 0))
+                    if not category:
+                        category = await self._create_empty_module_category(guild, code, role)
+                        await record(code, category_id=category.id)
+                    await self._create_module_channels(guild, code, category, template)
+                    
+                    finished[code] = {'name': state['name'], 'role_id': role.id, 'category_id': category.id}
+                    results['created'].append(code)
+                except Exception as e:
+                    results['failed'].append(f"{code}: {e}")
+                
+                if progress:
+                    await progress(len(finished) + len(results['failed']), len(pending), code)
+        
+        await asyncio.gather(*(build(code, state) for code, state in pending.items()))
+        
+        await self.dm.add_modules(finished)
+        
+        def clear(config):
+            run = config.get('module_provisioning', {})
+            for code in list(finished) + results['skipped']:
+                run.pop(code, None)
+            if not run:
+                config.pop('module_provisioning', None)
+        
+        await self.dm.modify_guild_config(guild.id, clear)
+        return results
+    
+    @commands.command(name="bulkcreatemods")
+    @is_admin()
+    async def bulk_create_modules(self, ctx, *, modules: str = None):
+        """Create many modules at once from a list or an attached CSV
+        
+        Usage:
+        !bulkcreatemods
+        COS1501 Theoretical Computer Science
+        MAT1512 Calculus A
+        
+        Or attach a CSV file of code,name rows. Run without a list to resume
+        an interrupted run.
+        """
+        text = modules or ""
+        for attachment in ctx.message.attachments:
+            text += "\n" + (await attachment.read()).decode("utf-8-sig")
+        entries = parse_module_list(text)
+        
+        if not entries and not await self.dm.get_guild_config_value(ctx.guild.id, 'module_provisioning'):
+            await ctx.send_help(ctx.command)
+            return
+        
+        status = await ctx.send(f"🔄 Creating {len(entries)} modules..." if entries else "🔄 Resuming module creation...")
+        
+        async def progress(done: int, total: int, code: str):
+            # Edit at most every few modules so the status message stays within rate limits
+            if done == total or done % 5 == 0:
+                await status.edit(content=f"🔄 Created {done}/{total} modules (last: **{code}**)")
+        
+        timer = StepTimer()
+        results = await self.provision_modules(ctx.guild, entries, progress)
+        
+        await send_embed(
+            ctx,
+            title="✅ Bulk Creation Finished" if not results['failed'] else "⚠️ Bulk Creation Incomplete",
+            fields=[
+                {'name': f"Created ({len(results['created'])})", 'value': format_list(sorted(results['created']), 20), 'inline': False},
+                {'name': f"Already Existed ({len(results['skipped'])})", 'value': format_list(sorted(results['skipped']), 20), 'inline': False},
+                {'name': f"Failed ({len(results['failed'])})", 'value': format_list(results['failed'], 10), 'inline': False}
+            ],
+            color=discord.Color.green() if not results['failed'] else discord.Color.orange(),
+            footer=f"Took {timer.total:.1f}s" + (" • Run !bulkcreatemods again to retry failures" if results['failed'] else "")
+        )
+        
+        if results['created']:
+            await log_action(
+                ctx.guild,
+                f"📦 {ctx.author.mention} created {len(results['created'])} modules in bulk",
+                discord.Color.green()
             )
+    
+    @commands.command(name="modtemplate")
+    @is_admin()
+    async def module_template(self, ctx, action: str = None, kind: str = None, channel_name: str = None, *, topic: str = None):
+        """Show or change the channels created for new modules
         
-        return category
+        Usage:
+        !modtemplate - Show the current template
+        !modtemplate add text labs Lab work and practicals
+        !modtemplate add voice study-room4
+        !modtemplate remove text labs
+        !modtemplate reset
+        """
+        template = copy.deepcopy(await self.get_module_template(ctx.guild.id))
+        
+        if action == "reset":
+            await self.dm.modify_guild_config(ctx.guild.id, lambda config: config.pop('module_template', None))
+            template = DEFAULT_MODULE_TEMPLATE
+        
+        elif action in ("add", "remove"):
+            if kind not in ("text", "voice") or not channel_name:
+                await ctx.send_help(ctx.command)
+                return
+            
+            names = [entry[0] for entry in template['text']] if kind == "text" else template['voice']
+            if action == "add":
+                if channel_name in names:
+                    await ctx.send(f"❌ `{channel_name}` is already in the template.")
+                    return
+                template[kind].append([channel_name, topic or ""] if kind == "text" else channel_name)
+            else:
+                if channel_name not in names:
+                    await ctx.send(f"❌ `{channel_name}` is not in the template.")
+                    return
+                del template[kind][names.index(channel_name)]
+            
+            await self.dm.update_guild_config(ctx.guild.id, module_template=template)
+        
+        elif action is not None:
+            await ctx.send_help(ctx.command)
+            return
+        
+        await send_embed(
+            ctx,
+            title="📐 Module Template",
+            fields=[
+                {'name': 'Text Channels', 'value': format_list([f"#{n} - {t}" if t else f"#{n}" for n, t in template['text']], 25), 'inline': False},
+                {'name': 'Voice Channels', 'value': format_list(template['voice'], 25), 'inline': False}
+            ],
+            color=discord.Color.blue(),
+            footer="Applies to modules created from now on"
+        )
     
     @commands.command(name="deletemod", aliases=["removemodule"])
     @is_admin()
@@ -148,7 +388,7 @@ class Modules(commands.Cog):
         """
         code = code.upper()
         
-        if not self.dm.module_exists(code):
+        if not await self.dm.module_exists(code):
             await send_embed(
                 ctx,
                 title="❌ Not Found",
@@ -169,24 +409,11 @@ class Modules(commands.Cog):
         await ctx.send(f"🔄 Deleting module **{code}**...")
         
         try:
-            module_data = self.dm.get_module(code)
-            
-            # Delete category and channels
-            if 'category_id' in module_data:
-                category = ctx.guild.get_channel(module_data['category_id'])
-                if category:
-                    for channel in category.channels:
-                        await channel.delete(reason=f"Deleting module {code}")
-                    await category.delete(reason=f"Deleting module {code}")
-            
-            # Delete role
-            if 'role_id' in module_data:
-                role = ctx.guild.get_role(module_data['role_id'])
-                if role:
-                    await role.delete(reason=f"Deleting module {code}")
+            module_data = await self.dm.get_module(code)
+            await self._teardown_module(ctx.guild, code, module_data)
             
             # Remove from database
-            self.dm.remove_module(code)
+            await self._forget_modules(ctx.guild, {code: module_data})
             
             await send_embed(
                 ctx,
@@ -209,6 +436,116 @@ class Modules(commands.Cog):
                 color=discord.Color.red(),
             )
     
+    @commands.command(name="deletemods", aliases=["removemodules"])
+    @is_admin()
+    async def delete_modules(self, ctx, *patterns: str):
+        """Delete several modules by code or glob pattern
+        
+        Usage: !deletemods COS1501 MAT15* confirm
+        """
+        confirmed = bool(patterns) and patterns[-1].lower() == "confirm"
+        if confirmed:
+            patterns = patterns[:-1]
+        
+        if not patterns:
+            await ctx.send_help(ctx.command)
+            return
+        
+        modules = await self.dm.get_modules()
+        codes = sorted(
+            code for code in modules
+            if any(fnmatch.fnmatchcase(code, pattern.upper()) for pattern in patterns)
+        )
+        
+        if not codes:
+            await send_embed(
+                ctx,
+                title="❌ Not Found",
+                description="No modules match " + ", ".join(f"`{p}`" for p in patterns),
+                color=discord.Color.red()
+            )
+            return
+        
+        if not confirmed:
+            await send_embed(
+                ctx,
+                title="⚠️ Confirmation Required",
+                description=(
+                    f"This will delete **{len(codes)}** modules and all their channels:\n"
+                    f"{format_list(codes, 20)}\n\nType: `!deletemods {' '.join(patterns)} confirm`"
+                ),
+                color=discord.Color.orange()
+            )
+            return
+        
+        await ctx.send(f"🔄 Deleting {len(codes)} modules...")
+        timer = StepTimer()
+        
+        # Every module's channels go out through the shared limiter at once
+        outcomes = await asyncio.gather(
+            *(self._teardown_module(ctx.guild, code, modules[code]) for code in codes),
+            return_exceptions=True
+        )
+        
+        deleted = {code: modules[code] for code, outcome in zip(codes, outcomes) if not isinstance(outcome, Exception)}
+        failed = [f"{code}: {outcome}" for code, outcome in zip(codes, outcomes) if isinstance(outcome, Exception)]
+        await self._forget_modules(ctx.guild, deleted)
+        
+        await send_embed(
+            ctx,
+            title="✅ Modules Deleted" if not failed else "⚠️ Some Deletions Failed",
+            fields=[
+                {'name': f"Deleted ({len(deleted)})", 'value': format_list(sorted(deleted), 20), 'inline': False},
+                {'name': f"Failed ({len(failed)})", 'value': format_list(failed, 10), 'inline': False}
+            ],
+            color=discord.Color.green() if not failed else discord.Color.orange(),
+            footer=f"Took {timer.total:.1f}s"
+        )
+        
+        if deleted:
+            await log_action(
+                ctx.guild,
+                f"🗑️ {ctx.author.mention} deleted {len(deleted)} modules: {', '.join(sorted(deleted))}",
+                discord.Color.red()
+            )
+    
+    async def _teardown_module(self, guild: discord.Guild, code: str, module_data: Dict[str, int]):
+        """Delete a module's channels concurrently, then its category and role"""
+        reason = f"Deleting module {code}"
+        
+        category = guild.get_channel(module_data.get('category_id', 0))
+        if category:
+            bucket = ("channels", guild.id)
+            await asyncio.gather(*(
+                rate_limiter.call(bucket, channel.delete, reason=reason)
+                for channel in category.channels
+            ))
+            await rate_limiter.call(bucket, category.delete, reason=reason)
+        
+        role = guild.get_role(module_data.get('role_id', 0))
+        if role:
+            await rate_limiter.call(("roles", guild.id), role.delete, reason=reason)
+    
+    async def _forget_modules(self, guild: discord.Guild, modules: Dict[str, Dict[str, int]]):
+        """Drop deleted modules from the module list, user stats and reaction-role mappings"""
+        if not modules:
+            return
+        
+        codes = list(modules)
+        role_ids = {data['role_id'] for data in modules.values() if data.get('role_id')}
+        
+        await self.dm.remove_modules(codes)
+        await self.dm.purge_user_modules(codes)
+        
+        async with self.dm.transaction(guild.id) as config:
+            for mappings in config.get('reaction_roles', {}).values():
+                for emoji in [emoji for emoji, role_id in mappings.items() if role_id in role_ids]:
+                    del mappings[emoji]
+        
+        reaction_roles = self.bot.get_cog("ReactionRoles")
+        if reaction_roles:
+            reaction_roles.forget_roles(role_ids)
+    
     @app_commands.command(name="modules", description="List all available modules")
     async def list_modules(self, interaction: Interaction):
         guild = interaction.guild
@@ -223,7 +560,7 @@ class Modules(commands.Cog):
             )
             return
 
-        modules = self.dm.get_modules()
+        modules = await self.dm.get_modules()
         if not modules:
             await send_embed(
                 interaction,
@@ -275,7 +612,7 @@ class Modules(commands.Cog):
             )
             return
 
-        if not self.dm.module_exists(module):
+        if not await self.dm.module_exists(module):
             await send_embed(
                 interaction,
                 title="❌ Not Found",
@@ -285,7 +622,7 @@ class Modules(commands.Cog):
             )
             return
 
-        module_data = self.dm.get_module(module)
+        module_data = await self.dm.get_module(module)
         role = guild.get_role(module_data.get("role_id", 0))
 
         if not role:
@@ -310,7 +647,7 @@ class Modules(commands.Cog):
 
         try:
             await member.add_roles(role, reason=f"Joined module {module}")
-            self.dm.add_user_module(member.id, module)
+            await self.dm.add_user_module(member.id, module)
 
             await send_embed(
                 interaction,
@@ -346,7 +683,7 @@ class Modules(commands.Cog):
             )
             return
 
-        if not self.dm.module_exists(module):
+        if not await self.dm.module_exists(module):
             await send_embed(
                 interaction,
                 title="❌ Not Found",
@@ -356,7 +693,7 @@ class Modules(commands.Cog):
             )
             return
 
-        module_data = self.dm.get_module(module)
+        module_data = await self.dm.get_module(module)
         role = guild.get_role(module_data.get("role_id", 0))
 
         if not role:
@@ -381,7 +718,7 @@ class Modules(commands.Cog):
 
         try:
             await member.remove_roles(role, reason=f"Left module {module}")
-            self.dm.remove_user_module(member.id, module)
+            await self.dm.remove_user_module(member.id, module)
 
             await send_embed(
                 interaction,
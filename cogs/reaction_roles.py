@@ -1,8 +1,76 @@
+import asyncio
 import discord
 from discord.ext import commands
-from typing import Dict, List
-from utils.data_manager import DataManager
-from utils.helpers import is_admin, is_owner, log_action, send_embed
+from typing import Dict, List, Optional, Set, Tuple
+from functools import partial
+from utils.helpers import is_admin, is_owner, log_action, send_embed, format_list, get_channel_by_name, get_category_by_name, get_or_fetch_member
+
+
+# Seconds to collect a member's reaction-role clicks before applying them in one update
+ROLE_DEBOUNCE_SECONDS = 2.0
+
+# Discord allows 25 options per select menu; the fifth row of each message holds the buttons
+PICKER_OPTIONS_PER_SELECT = 25
+PICKER_SELECTS_PER_MESSAGE = 4
+
+
+class ModulePickerView(discord.ui.View):
+    """Persistent module picker: select menus of modules plus a "My Modules" button
+    
+    Picking modules toggles them, so one menu both joins and leaves. Built with
+    no pages it only carries the custom IDs, which is all bot.add_view needs to
+    route clicks on picker messages posted before a restart.
+    """
+    
+    def __init__(self, cog: "ReactionRoles", pages: List[List[Tuple[str, str, int]]] = None):
+        super().__init__(timeout=None)
+        self.cog = cog
+        
+        for idx in range(PICKER_SELECTS_PER_MESSAGE):
+            page = pages[idx] if pages and idx < len(pages) else None
+            if pages is not None and page is None:
+                break
+            
+            select = discord.ui.Select(
+                custom_id=f"modulepicker:select:{idx}",
+                placeholder=f"Modules {page[0][0]} – {page[-1][0]}" if page else "Select modules",
+                min_values=1,
+                max_values=len(page) if page else PICKER_OPTIONS_PER_SELECT,
+                options=[
+                    discord.SelectOption(label=code, description=name[:100] if name != code else None, value=str(role_id))
+                    for code, name, role_id in page or []
+                ],
+                row=idx
+            )
+            select.callback = partial(self.toggle_modules, select)
+            self.add_item(select)
+    
+    async def toggle_modules(self, select: discord.ui.Select, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        try:
+            joined, left = await self.cog.toggle_modules(interaction.user, [int(value) for value in select.values])
+        except discord.Forbidden:
+            await interaction.followup.send("❌ I don't have permission to change your module roles. Please contact a staff member.", ephemeral=True)
+            return
+        except discord.HTTPException as e:
+            await interaction.followup.send(f"❌ Couldn't update your modules: {e.text or e}", ephemeral=True)
+            return
+        
+        lines = []
+        if joined:
+            lines.append("✅ Joined: " + ", ".join(f"**{code}**" for code in joined))
+        if left:
+            lines.append("❌ Left: " + ", ".join(f"**{code}**" for code in left))
+        await interaction.followup.send("\n".join(lines) or "Nothing changed.", ephemeral=True)
+    
+    @discord.ui.button(label="My Modules", emoji="📚", style=discord.ButtonStyle.secondary, custom_id="modulepicker:mine", row=4)
+    async def my_modules(self, interaction: discord.Interaction, button: discord.ui.Button):
+        role_ids = await self.cog.module_role_ids()
+        codes = sorted(role.name for role in interaction.user.roles if role.id in role_ids)
+        await interaction.response.send_message(
+            "📚 Your modules:\n" + format_list(codes, 25) if codes else "You haven't joined any modules yet.",
+            ephemeral=True
+        )
 
 
 class ReactionRoles(commands.Cog):
@@ -10,46 +78,71 @@ class ReactionRoles(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
-        self.dm = DataManager()
+        self.dm = bot.dm
         # Cache of message_id -> {emoji: role_id}
         self.reaction_roles: Dict[int, Dict[str, int]] = {}
+        # (guild_id, member_id) -> {role_id: add?} clicks waiting for the debounce window to close
+        self._pending_roles: Dict[Tuple[int, int], Dict[int, bool]] = {}
+        self._flush_tasks: Dict[Tuple[int, int], asyncio.Task] = {}
+        # (guild_id, member_id) -> [lock, callers holding or waiting on it, member returned by the last edit]
+        self._role_edits: Dict[Tuple[int, int], list] = {}
         
     async def cog_load(self):
-        """Load reaction role mappings on startup"""
+        """Load reaction role mappings and register the module picker on startup"""
+        await self.load_reaction_roles()
+        self.bot.add_view(ModulePickerView(self))
+    
+    async def cog_unload(self):
+        self.bot.reactions.unregister_owner(self)
+        
+        # Apply clicks still inside their window instead of dropping them
+        for task in self._flush_tasks.values():
+            task.cancel()
+        self._flush_tasks.clear()
+        await asyncio.gather(*(self._apply_pending(key) for key in list(self._pending_roles)))
+    
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Reload mappings once guilds are known; cog_load runs before login"""
         await self.load_reaction_roles()
     
     async def load_reaction_roles(self):
         """Load all reaction role messages from database"""
-        self.reaction_roles.clear()
+        for msg_id in list(self.reaction_roles):
+            self._unroute(msg_id)
         
         for guild in self.bot.guilds:
-            rr_data = self.dm.get_guild_config_value(guild.id, 'reaction_roles', {})
+            rr_data = await self.dm.get_guild_config_value(guild.id, 'reaction_roles', {})
             
             for msg_id_str, mappings in rr_data.items():
-                msg_id = int(msg_id_str)
-                self.reaction_roles[msg_id] = {}
-                
-                for emoji, role_id in mappings.items():
-                    self.reaction_roles[msg_id][emoji] = role_id
+                self._route(int(msg_id_str), dict(mappings))
     
-    @commands.command(name="setupreactionroles", aliases=["setuprr"])
-    @is_admin()
-    async def setup_reaction_roles(self, ctx):
-        """Create module selection channel with reaction roles
-        
-        Usage: !setupreactionroles
-        """
-        guild = ctx.guild
-        
-        # Find or create module-selection channel
+    def _route(self, message_id: int, mappings: Dict[str, int]):
+        """Cache a reaction role message and register it with the bot's reaction dispatcher"""
+        self.reaction_roles[message_id] = mappings
+        self.bot.reactions.register(message_id, self.handle_reaction_add, self.handle_reaction_remove)
+    
+    def _unroute(self, message_id: int):
+        """Forget a reaction role message"""
+        self.reaction_roles.pop(message_id, None)
+        self.bot.reactions.unregister(message_id)
+    
+    def forget_roles(self, role_ids: Set[int]):
+        """Drop cached mappings that point at deleted roles"""
+        for mappings in self.reaction_roles.values():
+            for emoji in [emoji for emoji, role_id in mappings.items() if role_id in role_ids]:
+                del mappings[emoji]
+    
+    async def _get_selection_channel(self, guild: discord.Guild) -> discord.TextChannel:
+        """Find or create the module-selection channel"""
         channel_name = "module-selection"
-        channel = discord.utils.get(guild.text_channels, name=channel_name)
+        channel = get_channel_by_name(guild, channel_name)
         
         if not channel:
             # Try to find Community Hub category
-            category = discord.utils.get(guild.categories, name="📚 Community Hub")
+            category = get_category_by_name(guild, "📚 Community Hub")
             if not category:
-                category = discord.utils.get(guild.categories, name="Community Hub")
+                category = get_category_by_name(guild, "Community Hub")
             
             channel = await guild.create_text_channel(
                 channel_name,
@@ -58,8 +151,20 @@ class ReactionRoles(commands.Cog):
                 reason="Reaction roles channel for module selection"
             )
         
+        return channel
+    
+    @commands.command(name="setupreactionroles", aliases=["setuprr"])
+    @is_admin()
+    async def setup_reaction_roles(self, ctx):
+        """Create module selection channel with reaction roles
+        
+        Usage: !setupreactionroles
+        """
+        guild = ctx.guild
+        channel = await self._get_selection_channel(guild)
+        
         # Get all modules
-        modules = self.dm.get_modules()
+        modules = await self.dm.get_modules()
         
         if not modules:
             await send_embed(
@@ -72,6 +177,8 @@ class ReactionRoles(commands.Cog):
         
         # Clear existing messages in channel
         await channel.purge(limit=100)
+        for msg_id_str in await self.dm.get_guild_config_value(guild.id, 'reaction_roles', {}):
+            self._unroute(int(msg_id_str))
         
         # Create beautiful embed
         embed = discord.Embed(
@@ -138,12 +245,15 @@ class ReactionRoles(commands.Cog):
                 await message.add_reaction(emoji)
             
             # Save to cache and database
-            self.reaction_roles[message.id] = emoji_role_map
+            self._route(message.id, emoji_role_map)
             reaction_role_data[str(message.id)] = emoji_role_map
         
         # Save to database
-        self.dm.set_guild_config(guild.id, 'reaction_roles', reaction_role_data)
-        self.dm.set_guild_config(guild.id, 'reaction_role_channel', channel.id)
+        await self.dm.update_guild_config(
+            guild.id,
+            reaction_roles=reaction_role_data,
+            reaction_role_channel=channel.id
+        )
         
         await send_embed(
             ctx,
@@ -158,6 +268,151 @@ class ReactionRoles(commands.Cog):
             discord.Color.green()
         )
     
+    # ==================== MODULE PICKER ====================
+    
+    async def module_role_ids(self) -> Dict[int, str]:
+        """Map each module role ID to its module code"""
+        modules = await self.dm.get_modules()
+        return {data['role_id']: code for code, data in modules.items() if data.get('role_id')}
+    
+    async def toggle_modules(self, member: discord.Member, role_ids: List[int]) -> Tuple[List[str], List[str]]:
+        """Join the picked modules the member is not in and leave the rest with one role update"""
+        modules_by_role = await self.module_role_ids()
+        picked = [role_id for role_id in role_ids if role_id in modules_by_role]
+        return await self.apply_role_changes(member, [], [], reason="Module picker selection", toggle=picked)
+    
+    async def apply_role_changes(
+        self,
+        member: discord.Member,
+        add: List[int],
+        remove: List[int],
+        reason: str,
+        toggle: List[int] = ()
+    ) -> Tuple[List[str], List[str]]:
+        """Add, remove and toggle module roles with one member.edit and one stats write
+        
+        Edits for the same member run one at a time, each starting from the roles
+        the previous edit left, so concurrent picker clicks and reaction flushes
+        don't overwrite each other. Returns the module codes joined and left;
+        roles already in the wanted state are skipped.
+        """
+        key = (member.guild.id, member.id)
+        entry = self._role_edits.setdefault(key, [asyncio.Lock(), 0, None])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                # The caller's member may be a snapshot taken before an edit that just finished
+                member = entry[2] or member
+                modules_by_role = await self.module_role_ids()
+                current = {role.id for role in member.roles}
+                add = list(add) + [role_id for role_id in toggle if role_id not in current]
+                remove = list(remove) + [role_id for role_id in toggle if role_id in current]
+                
+                roles = [role for role in member.roles if not role.is_default()]
+                joined, left = [], []
+                for role_id in add:
+                    role = member.guild.get_role(role_id)
+                    if role and role_id not in current and role not in roles:
+                        roles.append(role)
+                        joined.append(modules_by_role.get(role_id, role.name))
+                for role_id in remove:
+                    role = member.guild.get_role(role_id)
+                    if role and role_id in current and role in roles:
+                        roles.remove(role)
+                        left.append(modules_by_role.get(role_id, role.name))
+                
+                if not joined and not left:
+                    return joined, left
+                
+                entry[2] = await member.edit(roles=roles, reason=reason) or await member.guild.fetch_member(member.id)
+                await self.dm.update_user_modules(member.id, joined, left)
+                return joined, left
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._role_edits[key]
+    
+    @commands.command(name="setupmodulepicker", aliases=["setuppicker"])
+    @is_admin()
+    async def setup_module_picker(self, ctx):
+        """Post select menus for joining and leaving modules
+        
+        Handles any number of modules (100 per message). Run again after
+        creating or deleting modules to refresh the menus.
+        
+        Usage: !setupmodulepicker
+        """
+        guild = ctx.guild
+        modules = await self.dm.get_modules()
+        
+        entries = []
+        for code, data in sorted(modules.items()):
+            if data.get('role_id') and guild.get_role(data['role_id']):
+                entries.append((code, data.get('name', code), data['role_id']))
+        
+        if not entries:
+            await send_embed(
+                ctx,
+                title="❌ No Modules",
+                description="Create some modules first using `!createmod <code>`",
+                color=discord.Color.red()
+            )
+            return
+        
+        channel = await self._get_selection_channel(guild)
+        
+        # Replace the previous picker messages
+        previous = await self.dm.get_guild_config_value(guild.id, 'module_picker', {})
+        old_channel = guild.get_channel(previous.get('channel_id', 0))
+        if old_channel and previous.get('message_ids'):
+            try:
+                await old_channel.delete_messages([discord.Object(id=msg_id) for msg_id in previous['message_ids']])
+            except discord.HTTPException:
+                # Bulk deletion rejects messages older than 14 days, e.g. last semester's picker
+                for msg_id in previous['message_ids']:
+                    try:
+                        await old_channel.get_partial_message(msg_id).delete()
+                    except discord.NotFound:
+                        pass  # Already deleted
+        
+        pages = [entries[i:i + PICKER_OPTIONS_PER_SELECT] for i in range(0, len(entries), PICKER_OPTIONS_PER_SELECT)]
+        messages = [pages[i:i + PICKER_SELECTS_PER_MESSAGE] for i in range(0, len(pages), PICKER_SELECTS_PER_MESSAGE)]
+        
+        message_ids = []
+        for msg_idx, message_pages in enumerate(messages):
+            embed = discord.Embed(
+                title="📚 Module Selection" if msg_idx == 0 else f"📚 Module Selection (Part {msg_idx + 1})",
+                description=(
+                    "Pick modules from the menus below to join them and access their channels.\n\n"
+                    "**How it works:**\n"
+                    "✅ Pick a module you're not in to join it\n"
+                    "❌ Pick a module you're already in to leave it\n"
+                    "📚 Click **My Modules** to see what you've joined"
+                ) if msg_idx == 0 else None,
+                color=discord.Color.blue()
+            )
+            embed.set_footer(text=f"{len(entries)} modules available")
+            message = await channel.send(embed=embed, view=ModulePickerView(self, message_pages))
+            message_ids.append(message.id)
+        
+        await self.dm.update_guild_config(
+            guild.id,
+            module_picker={'channel_id': channel.id, 'message_ids': message_ids}
+        )
+        
+        await send_embed(
+            ctx,
+            title="✅ Module Picker Setup",
+            description=f"Module selection is ready in {channel.mention}!\n\n{len(entries)} modules across {len(message_ids)} message(s).",
+            color=discord.Color.green()
+        )
+        
+        await log_action(
+            guild,
+            f"✅ {ctx.author.mention} set up the module picker in {channel.mention}",
+            discord.Color.green()
+        )
+    
     @commands.command(name="syncreactionroles", aliases=["syncrr"])
     @is_admin()
     async def sync_reaction_roles(self, ctx):
@@ -178,7 +433,7 @@ class ReactionRoles(commands.Cog):
         Usage: !clearreactionroles
         """
         guild = ctx.guild
-        channel_id = self.dm.get_guild_config_value(guild.id, 'reaction_role_channel')
+        channel_id = await self.dm.get_guild_config_value(guild.id, 'reaction_role_channel')
         
         if not channel_id:
             await send_embed(
@@ -194,15 +449,14 @@ class ReactionRoles(commands.Cog):
             await channel.purge(limit=100)
         
         # Clear from database
-        self.dm.set_guild_config(guild.id, 'reaction_roles', {})
-        self.dm.set_guild_config(guild.id, 'reaction_role_channel', None)
+        async with self.dm.transaction(guild.id) as config:
+            rr_data = config.get('reaction_roles', {})
+            config['reaction_roles'] = {}
+            config['reaction_role_channel'] = None
         
         # Clear cache
-        rr_data = self.dm.get_guild_config_value(guild.id, 'reaction_roles', {})
         for msg_id_str in rr_data.keys():
-            msg_id = int(msg_id_str)
-            if msg_id in self.reaction_roles:
-                del self.reaction_roles[msg_id]
+            self._unroute(int(msg_id_str))
         
         await send_embed(
             ctx,
@@ -211,102 +465,64 @@ class ReactionRoles(commands.Cog):
             color=discord.Color.green()
         )
     
-    @commands.Cog.listener()
-    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
-        """Handle reaction additions"""
-        # Ignore bot reactions
-        if payload.user_id == self.bot.user.id:
-            return
-        
-        # Check if this is a reaction role message
-        if payload.message_id not in self.reaction_roles:
-            return
-        
+    def _reaction_role(self, payload: discord.RawReactionActionEvent) -> Tuple[Optional[discord.Guild], Optional[int]]:
+        """Resolve the guild and mapped role ID of a reaction role event"""
         guild = self.bot.get_guild(payload.guild_id)
-        if not guild:
-            return
-        
-        member = guild.get_member(payload.user_id)
-        if not member:
-            return
-        
-        # Get the emoji string
-        emoji_str = str(payload.emoji)
-        
-        # Get role ID from mapping
-        role_id = self.reaction_roles[payload.message_id].get(emoji_str)
-        if not role_id:
-            return
-        
-        role = guild.get_role(role_id)
-        if not role:
-            return
-        
-        # Add role to member
-        try:
-            await member.add_roles(role, reason="Reaction role selection")
-            
-            # Update user stats
-            module_code = role.name
-            self.dm.add_user_module(member.id, module_code)
-            
-            # Send DM confirmation
-            try:
-                await member.send(
-                    f"✅ You've joined **{role.name}**! You can now access its channels in {guild.name}."
-                )
-            except discord.Forbidden:
-                pass  # User has DMs disabled
-                
-        except discord.Forbidden:
-            pass  # Bot doesn't have permission
+        role_id = self.reaction_roles.get(payload.message_id, {}).get(str(payload.emoji))
+        if not guild or not role_id or not guild.get_role(role_id):
+            return None, None
+        return guild, role_id
     
-    @commands.Cog.listener()
-    async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
-        """Handle reaction removals"""
-        # Ignore bot reactions
-        if payload.user_id == self.bot.user.id:
-            return
-        
-        # Check if this is a reaction role message
-        if payload.message_id not in self.reaction_roles:
-            return
-        
-        guild = self.bot.get_guild(payload.guild_id)
-        if not guild:
-            return
-        
-        member = guild.get_member(payload.user_id)
-        if not member:
-            return
-        
-        # Get the emoji string
-        emoji_str = str(payload.emoji)
-        
-        # Get role ID from mapping
-        role_id = self.reaction_roles[payload.message_id].get(emoji_str)
-        if not role_id:
-            return
-        
-        role = guild.get_role(role_id)
-        if not role:
+    async def handle_reaction_add(self, payload: discord.RawReactionActionEvent):
+        """Handle reaction additions routed here by the bot's reaction dispatcher"""
+        guild, role_id = self._reaction_role(payload)
+        if guild:
+            self._queue_role_change(guild.id, payload.user_id, role_id, True)
+    
+    async def handle_reaction_remove(self, payload: discord.RawReactionActionEvent):
+        """Handle reaction removals routed here by the bot's reaction dispatcher"""
+        guild, role_id = self._reaction_role(payload)
+        if guild:
+            self._queue_role_change(guild.id, payload.user_id, role_id, False)
+    
+    def _queue_role_change(self, guild_id: int, member_id: int, role_id: int, add: bool):
+        """Collect a reaction-role click; the member's clicks are applied together when the window closes"""
+        key = (guild_id, member_id)
+        # The last click on a role wins, so add-then-remove cancels out
+        self._pending_roles.setdefault(key, {})[role_id] = add
+        if key not in self._flush_tasks:
+            self._flush_tasks[key] = asyncio.create_task(self._flush_after_window(key))
+    
+    async def _flush_after_window(self, key: Tuple[int, int]):
+        await asyncio.sleep(ROLE_DEBOUNCE_SECONDS)
+        self._flush_tasks.pop(key, None)
+        await self._apply_pending(key)
+    
+    async def _apply_pending(self, key: Tuple[int, int]):
+        """Apply a member's collected clicks with one role update, one stats write and one DM"""
+        changes = self._pending_roles.pop(key, {})
+        guild = self.bot.get_guild(key[0])
+        member = await get_or_fetch_member(guild, key[1]) if guild and changes else None
+        if not member or not changes:
             return
         
-        # Remove role from member
         try:
-            await member.remove_roles(role, reason="Reaction role removal")
-            
-            # Send DM confirmation
-            try:
-                await member.send(
-                    f"❌ You've left **{role.name}** in {guild.name}."
-                )
-            except discord.Forbidden:
-                pass  # User has DMs disabled
-                
+            joined, left = await self.apply_role_changes(
+                member,
+                [role_id for role_id, add in changes.items() if add],
+                [role_id for role_id, add in changes.items() if not add],
+                reason="Reaction role selection"
+            )
         except discord.Forbidden:
-            pass  # Bot doesn't have permission
-
+            return  # Bot doesn't have permission
+        
+        lines = []
+        if joined:
+            lines.append(f"✅ You've joined {', '.join(f'**{code}**' for code in joined)}! You can now access their channels in {guild.name}.")
+        if left:
+            lines.append(f"❌ You've left {', '.join(f'**{code}**' for code in left)} in {guild.name}.")
+        if lines:
+            self.bot.dms.send(member, "\n".join(lines))
 
 async def setup(bot):
     await bot.add_cog(ReactionRoles(bot))
\ No newline at end of file
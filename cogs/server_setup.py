@@ -1,7 +1,69 @@
+import asyncio
 import discord
 from discord.ext import commands
-from utils.data_manager import DataManager
-from utils.helpers import is_owner, log_action, send_embed
+from typing import Dict, Tuple, Union
+from utils.helpers import is_owner, log_action, send_embed, get_role_by_name, get_or_fetch_member
+from utils.name_index import name_index
+from utils.data_manager import DataWriteError
+from utils.rate_limit import StepTimer
+from utils.server_template import ServerTemplate, load_template, format_plan
+
+
+# Roles that can see every ticket channel
+STAFF_ROLES = ("Admin", "Moderator", "Helper")
+
+
+def _next_ticket_number(config: dict) -> int:
+    """Allocate the next ticket number from a guild's config"""
+    config['ticket_counter'] = config.get('ticket_counter', 0) + 1
+    return config['ticket_counter']
+
+
+class TicketPanelView(discord.ui.View):
+    """Persistent "Create Ticket" button on the support panel"""
+    
+    def __init__(self, cog: "ServerSetup"):
+        super().__init__(timeout=None)
+        self.cog = cog
+    
+    @discord.ui.button(label="Create Ticket", emoji="🎫", style=discord.ButtonStyle.green, custom_id="tickets:create")
+    async def create_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        
+        try:
+            ticket_channel, created = await self.cog._create_ticket(interaction.guild, interaction.user)
+        except discord.Forbidden:
+            await interaction.followup.send("❌ I don't have permission to create ticket channels. Please contact a staff member.", ephemeral=True)
+            return
+        except discord.HTTPException as e:
+            await interaction.followup.send(f"❌ Couldn't create your ticket: {e.text or e}", ephemeral=True)
+            return
+        except DataWriteError:
+            await interaction.followup.send("❌ Couldn't save your ticket. Please try again later.", ephemeral=True)
+            return
+        
+        if created:
+            message = f"✅ Your support ticket has been created: {ticket_channel.mention}\nA staff member will assist you shortly."
+        else:
+            message = f"❌ You already have an open ticket: {ticket_channel.mention}\nPlease use that channel or close it first before creating a new one."
+        await interaction.followup.send(message, ephemeral=True)
+
+
+class TicketControlView(discord.ui.View):
+    """Persistent "Close Ticket" button posted in every ticket channel"""
+    
+    def __init__(self, cog: "ServerSetup"):
+        super().__init__(timeout=None)
+        self.cog = cog
+    
+    @discord.ui.button(label="Close Ticket", emoji="🔒", style=discord.ButtonStyle.red, custom_id="tickets:close")
+    async def close_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if not interaction.channel.name.startswith("ticket-"):
+            await interaction.response.send_message("❌ This is not a ticket channel.", ephemeral=True)
+            return
+        
+        await interaction.response.defer()
+        await self.cog._close_ticket_channel(interaction.guild, interaction.channel, interaction.user)
 
 
 class ServerSetup(commands.Cog):
@@ -9,333 +71,182 @@ class ServerSetup(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
-        self.dm = DataManager()
+        self.dm = bot.dm
+        # guild_id -> staff overwrites for ticket channels, dropped when roles change
+        self._ticket_overwrites: Dict[int, Dict[Union[discord.Role, discord.Member], discord.PermissionOverwrite]] = {}
+    
+    async def cog_load(self):
+        """Re-register the ticket buttons so panels posted before a restart keep working"""
+        self.bot.add_view(TicketPanelView(self))
+        self.bot.add_view(TicketControlView(self))
     
     @commands.command(name="fullsetup")
     @is_owner()
-    async def full_server_setup(self, ctx):
+    async def full_server_setup(self, ctx, mode: str = None):
         """Complete server setup with all channels, roles, and systems (Owner only)
         
-        This creates:
+        Brings the server in line with templates/full_setup.json:
         - Staff roles (Admin, Moderator, Helper)
         - All necessary channels organized in categories
         - Ticket system
-        - Reaction roles channel
+        - Module selection channel
         - Rules and welcome messages
         
-        Usage: !fullsetup
-        """
-        await ctx.send("🚀 Starting complete server setup... This may take a minute.")
+        Only what is missing or different is changed, so it is safe to re-run.
         
+        Usage: !fullsetup [plan]
+        """
         guild = ctx.guild
+        template = ServerTemplate(guild, load_template("full_setup"))
+        steps = template.plan()
+        
+        await send_embed(
+            ctx,
+            title="📋 Server Setup Plan",
+            description=format_plan(steps),
+            color=discord.Color.blue(),
+            footer=f"{len(steps)} changes" + (" • Run !fullsetup to apply" if mode == "plan" else "")
+        )
+        if mode == "plan":
+            return
+        
         results = []
         
         try:
-            # === STEP 1: Create Roles ===
-            results.append("**Creating Roles...**")
-            roles_created = await self._create_staff_roles(guild)
-            results.append(f"✅ Created {len(roles_created)} staff roles")
-            
-            # === STEP 2: Create Categories and Channels ===
-            results.append("\n**Creating Channels...**")
-            
-            # Information Category
-            info_cat = await guild.create_category("📋 INFORMATION")
-            results.append(f"✅ Created {info_cat.name}")
-            
-            welcome_ch = await guild.create_text_channel(
-                "welcome",
-                category=info_cat,
-                topic="Welcome to the UNISA BSc Community!"
-            )
-            
-            rules_ch = await guild.create_text_channel(
-                "rules",
-                category=info_cat,
-                topic="Server rules - Read before participating"
-            )
-            
-            announcements_ch = await guild.create_text_channel(
-                "announcements",
-                category=info_cat,
-                topic="Important server announcements"
-            )
-            
-            module_selection_ch = await guild.create_text_channel(
-                "module-selection",
-                category=info_cat,
-                topic="React to select your modules"
-            )
-            
-            faq_ch = await guild.create_text_channel(
-                "faq",
-                category=info_cat,
-                topic="Frequently asked questions"
-            )
-            
-            # Set permissions for announcements (read-only for everyone)
-            await announcements_ch.set_permissions(
-                guild.default_role,
-                send_messages=False,
-                add_reactions=False
-            )
-            
-            results.append(f"✅ Created Information channels")
-            
-            # Community Hub Category
-            community_cat = await guild.create_category("💬 COMMUNITY")
-            results.append(f"✅ Created {community_cat.name}")
-            
-            await guild.create_text_channel(
-                "general-chat",
-                category=community_cat,
-                topic="General discussion and casual chat"
-            )
-            
-            introductions_ch = await guild.create_text_channel(
-                "introductions",
-                category=community_cat,
-                topic="Introduce yourself to the community!"
-            )
-            
-            await guild.create_text_channel(
-                "off-topic",
-                category=community_cat,
-                topic="Off-topic discussions"
-            )
-            
-            await guild.create_text_channel(
-                "memes-and-fun",
-                category=community_cat,
-                topic="Share memes and have fun!"
-            )
-            
-            await guild.create_text_channel(
-                "events-schedule",
-                category=community_cat,
-                topic="Upcoming events and deadlines"
-            )
-            
-            results.append(f"✅ Created Community channels")
-            
-            # Study Spaces Category
-            study_cat = await guild.create_category("📚 STUDY SPACES")
-            results.append(f"✅ Created {study_cat.name}")
-            
-            await guild.create_text_channel(
-                "group-finder",
-                category=study_cat,
-                topic="Find study partners and form study groups"
-            )
-            
-            await guild.create_text_channel(
-                "exam-prep",
-                category=study_cat,
-                topic="Exam preparation and study tips"
-            )
-            
-            await guild.create_text_channel(
-                "general-help",
-                category=study_cat,
-                topic="Get help with any subject"
-            )
-            
-            await guild.create_text_channel(
-                "resources",
-                category=study_cat,
-                topic="Share useful study resources and materials"
-            )
-            
-            # Voice channels
-            await guild.create_voice_channel("📞 Study Lobby", category=study_cat)
-            await guild.create_voice_channel("🔇 Quiet Study", category=study_cat)
-            
-            for i in range(1, 4):
-                await guild.create_voice_channel(
-                    f"📚 Study Room {i}",
-                    category=study_cat
+            # === STEP 1: Create Roles, Categories and Channels ===
+            timer = StepTimer()
+            objects = await template.apply(steps)
+            created = {step.name for step in steps if step.action == "create"}
+            results.append(f"✅ Applied {len(steps)} layout changes in {timer.total:.1f}s")
+            
+            welcome_ch = objects["welcome"]
+            rules_ch = objects["rules"]
+            module_selection_ch = objects["module-selection"]
+            introductions_ch = objects["introductions"]
+            create_ticket_ch = objects["create-ticket"]
+            support_cat = objects["🎫 SUPPORT"]
+            server_logs_ch = objects["server-logs"]
+            
+            # Messages are only posted into channels this run created, so re-runs don't repeat them
+            
+            # === STEP 2: Post Welcome Message ===
+            if "welcome" in created:
+                welcome_embed = discord.Embed(
+                    title="👋 Welcome to UNISA BSc Community!",
+                    description=(
+                        f"Welcome to our community! We're glad to have you here.\n\n"
+                        f"**Getting Started:**\n"
+                        f"1️⃣ Read the rules in {rules_ch.mention}\n"
+                        f"2️⃣ Select your modules in {module_selection_ch.mention}\n"
+                        f"3️⃣ Introduce yourself in {introductions_ch.mention}\n"
+                        f"4️⃣ Join a study room and start collaborating!\n\n"
+                        f"**Need Help?**\n"
+                        f"Create a ticket in {create_ticket_ch.mention}\n\n"
+                        f"Happy studying! 📚"
+                    ),
+                    color=discord.Color.blue()
+                )
+                welcome_embed.set_thumbnail(url=guild.icon.url if guild.icon else None)
+                await welcome_ch.send(embed=welcome_embed)
+                results.append(f"✅ Posted welcome message")
+            
+            # === STEP 3: Post Rules ===
+            if "rules" in created:
+                rules_embed = discord.Embed(
+                    title="📜 Server Rules",
+                    description="Please read and follow these rules to maintain a positive learning environment.",
+                    color=discord.Color.blue()
                 )
             
-            results.append(f"✅ Created Study Space channels")
-            
-            # Support/Ticket Category
-            support_cat = await guild.create_category("🎫 SUPPORT")
-            
-            # Set permissions so only staff can see
-            admin_role = discord.utils.get(guild.roles, name="Admin")
-            mod_role = discord.utils.get(guild.roles, name="Moderator")
-            helper_role = discord.utils.get(guild.roles, name="Helper")
-            
-            await support_cat.set_permissions(guild.default_role, view_channel=False)
-            if admin_role:
-                await support_cat.set_permissions(admin_role, view_channel=True)
-            if mod_role:
-                await support_cat.set_permissions(mod_role, view_channel=True)
-            if helper_role:
-                await support_cat.set_permissions(helper_role, view_channel=True)
-            
-            create_ticket_ch = await guild.create_text_channel(
-                "create-ticket",
-                category=support_cat,
-                topic="React to create a support ticket"
-            )
-            
-            # Make create-ticket visible to everyone
-            await create_ticket_ch.set_permissions(
-                guild.default_role,
-                view_channel=True,
-                send_messages=False
-            )
-            
-            results.append(f"✅ Created Support category")
-            
-            # Staff Category
-            staff_cat = await guild.create_category("👥 STAFF")
-            await staff_cat.set_permissions(guild.default_role, view_channel=False)
-            if admin_role:
-                await staff_cat.set_permissions(admin_role, view_channel=True)
-            if mod_role:
-                await staff_cat.set_permissions(mod_role, view_channel=True)
-            
-            await guild.create_text_channel(
-                "staff-chat",
-                category=staff_cat,
-                topic="Staff discussion and coordination"
-            )
-            
-            await guild.create_text_channel(
-                "mod-logs",
-                category=staff_cat,
-                topic="Moderation action logs"
-            )
-            
-            bot_commands_ch = await guild.create_text_channel(
-                "bot-commands",
-                category=staff_cat,
-                topic="Use bot admin commands here"
-            )
-            
-            server_logs_ch = await guild.create_text_channel(
-                "server-logs",
-                category=staff_cat,
-                topic="Server event logs"
-            )
-            
-            # Save log channel
-            self.dm.set_guild_config(guild.id, 'log_channel_id', server_logs_ch.id)
-            
-            await guild.create_voice_channel("Staff Room", category=staff_cat)
-            
-            results.append(f"✅ Created Staff channels")
-            
-            # === STEP 3: Post Welcome Message ===
-            welcome_embed = discord.Embed(
-                title="👋 Welcome to UNISA BSc Community!",
-                description=(
-                    f"Welcome to our community! We're glad to have you here.\n\n"
-                    f"**Getting Started:**\n"
-                    f"1️⃣ Read the rules in {rules_ch.mention}\n"
-                    f"2️⃣ Select your modules in {module_selection_ch.mention}\n"
-                    f"3️⃣ Introduce yourself in {introductions_ch.mention}\n"
-                    f"4️⃣ Join a study room and start collaborating!\n\n"
-                    f"**Need Help?**\n"
-                    f"Create a ticket in {create_ticket_ch.mention}\n\n"
-                    f"Happy studying! 📚"
-                ),
-                color=discord.Color.blue()
-            )
-            welcome_embed.set_thumbnail(url=guild.icon.url if guild.icon else None)
-            await welcome_ch.send(embed=welcome_embed)
-            results.append(f"✅ Posted welcome message")
-            
-            # === STEP 4: Post Rules ===
-            rules_embed = discord.Embed(
-                title="📜 Server Rules",
-                description="Please read and follow these rules to maintain a positive learning environment.",
-                color=discord.Color.blue()
-            )
-            
-            rules_embed.add_field(
-                name="1️⃣ Be Respectful",
-                value="Treat all members with respect. No harassment, hate speech, discrimination, or bullying of any kind.",
-                inline=False
-            )
+                rules_embed.add_field(
+                    name="1️⃣ Be Respectful",
+                    value="Treat all members with respect. No harassment, hate speech, discrimination, or bullying of any kind.",
+                    inline=False
+                )
             
-            rules_embed.add_field(
-                name="2️⃣ Academic Integrity",
-                value="No cheating or sharing of exam answers. Help each other learn and understand, don't just give answers. Plagiarism is not tolerated.",
-                inline=False
-            )
+                rules_embed.add_field(
+                    name="2️⃣ Academic Integrity",
+                    value="No cheating or sharing of exam answers. Help each other learn and understand, don't just give answers. Plagiarism is not tolerated.",
+                    inline=False
+                )
             
-            rules_embed.add_field(
-                name="3️⃣ No Spam or Self-Promotion",
-                value="Keep conversations relevant. No excessive advertisements, self-promotion, or spam. Ask staff before promoting external content.",
-                inline=False
-            )
+                rules_embed.add_field(
+                    name="3️⃣ No Spam or Self-Promotion",
+                    value="Keep conversations relevant. No excessive advertisements, self-promotion, or spam. Ask staff before promoting external content.",
+                    inline=False
+                )
             
-            rules_embed.add_field(
-                name="4️⃣ Stay On Topic",
-                value="Use appropriate channels for discussions. Module channels are for module-specific content only. Keep general chat in community channels.",
-                inline=False
-            )
+                rules_embed.add_field(
+                    name="4️⃣ Stay On Topic",
+                    value="Use appropriate channels for discussions. Module channels are for module-specific content only. Keep general chat in community channels.",
+                    inline=False
+                )
             
-            rules_embed.add_field(
-                name="5️⃣ Use Voice Channels Responsibly",
-                value="Voice channels are for studying and collaboration. Keep noise levels appropriate and respect others' learning time.",
-                inline=False
-            )
+                rules_embed.add_field(
+                    name="5️⃣ Use Voice Channels Responsibly",
+                    value="Voice channels are for studying and collaboration. Keep noise levels appropriate and respect others' learning time.",
+                    inline=False
+                )
             
-            rules_embed.add_field(
-                name="6️⃣ No NSFW Content",
-                value="This is an educational server. No NSFW, explicit, or inappropriate content of any kind.",
-                inline=False
-            )
+                rules_embed.add_field(
+                    name="6️⃣ No NSFW Content",
+                    value="This is an educational server. No NSFW, explicit, or inappropriate content of any kind.",
+                    inline=False
+                )
             
-            rules_embed.add_field(
-                name="7️⃣ Listen to Staff",
-                value="Follow instructions from Admins, Moderators, and Helpers. They're here to help maintain a positive environment.",
-                inline=False
-            )
+                rules_embed.add_field(
+                    name="7️⃣ Listen to Staff",
+                    value="Follow instructions from Admins, Moderators, and Helpers. They're here to help maintain a positive environment.",
+                    inline=False
+                )
             
-            rules_embed.add_field(
-                name="8️⃣ Ask Questions!",
-                value="Don't hesitate to ask for help! We're all here to learn together. No question is too simple.",
-                inline=False
-            )
+                rules_embed.add_field(
+                    name="8️⃣ Ask Questions!",
+                    value="Don't hesitate to ask for help! We're all here to learn together. No question is too simple.",
+                    inline=False
+                )
             
-            rules_embed.set_footer(text=f"Last updated: {discord.utils.utcnow().strftime('%Y-%m-%d')} • Violating rules may result in warnings, timeouts, or bans")
+                rules_embed.set_footer(text=f"Last updated: {discord.utils.utcnow().strftime('%Y-%m-%d')} • Violating rules may result in warnings, timeouts, or bans")
+            
+                await rules_ch.send(embed=rules_embed)
+                results.append(f"✅ Posted server rules")
+            
+            # === STEP 4: Setup Ticket System ===
+            config = await self.dm.get_guild_config(guild.id)
+            ticket_message_id = config.get('ticket_message_id')
+            if "create-ticket" in created or not ticket_message_id:
+                ticket_embed = discord.Embed(
+                    title="🎫 Support Tickets",
+                    description=(
+                        "Need help from the staff team? Create a support ticket!\n\n"
+                        "**When to create a ticket:**\n"
+                        "• Report rule violations or harassment\n"
+                        "• Request assistance with technical issues\n"
+                        "• Ask questions about the server\n"
+                        "• Request module creation\n"
+                        "• Other issues requiring staff attention\n\n"
+                        "Click **Create Ticket** below to open a ticket."
+                    ),
+                    color=discord.Color.green()
+                )
+                ticket_embed.set_footer(text="A private channel will be created for you and the staff team")
             
-            await rules_ch.send(embed=rules_embed)
-            results.append(f"✅ Posted server rules")
+                ticket_msg = await create_ticket_ch.send(embed=ticket_embed, view=TicketPanelView(self))
+                ticket_message_id = ticket_msg.id
+                results.append(f"✅ Setup ticket system")
             
-            # === STEP 5: Setup Ticket System ===
-            ticket_embed = discord.Embed(
-                title="🎫 Support Tickets",
-                description=(
-                    "Need help from the staff team? Create a support ticket!\n\n"
-                    "**When to create a ticket:**\n"
-                    "• Report rule violations or harassment\n"
-                    "• Request assistance with technical issues\n"
-                    "• Ask questions about the server\n"
-                    "• Request module creation\n"
-                    "• Other issues requiring staff attention\n\n"
-                    "React with 🎫 below to create a ticket."
-                ),
-                color=discord.Color.green()
+            # Save ticket message ID and log channel
+            await self.dm.update_guild_config(
+                guild.id,
+                ticket_message_id=ticket_message_id,
+                ticket_channel_id=create_ticket_ch.id,
+                ticket_category_id=support_cat.id,
+                log_channel_id=server_logs_ch.id
             )
-            ticket_embed.set_footer(text="A private channel will be created for you and the staff team")
-            
-            ticket_msg = await create_ticket_ch.send(embed=ticket_embed)
-            await ticket_msg.add_reaction("🎫")
+            name_index.set_log_channel(guild.id, server_logs_ch.id)
             
-            # Save ticket message ID
-            self.dm.set_guild_config(guild.id, 'ticket_message_id', ticket_msg.id)
-            self.dm.set_guild_config(guild.id, 'ticket_channel_id', create_ticket_ch.id)
-            self.dm.set_guild_config(guild.id, 'ticket_category_id', support_cat.id)
             
-            results.append(f"✅ Setup ticket system")
-            
-            # === STEP 6: Send Summary ===
+            # === STEP 5: Send Summary ===
             summary = "\n".join(results)
             
             await send_embed(
@@ -343,7 +254,7 @@ class ServerSetup(commands.Cog):
                 title="✅ Server Setup Complete!",
                 description=summary,
                 color=discord.Color.green(),
-                footer="Use !setupreactionroles to enable module selection"
+                footer="Use !setupmodulepicker to enable module selection"
             )
             
             await log_action(
@@ -367,149 +278,65 @@ class ServerSetup(commands.Cog):
                 color=discord.Color.red()
             )
     
-    async def _create_staff_roles(self, guild: discord.Guild):
-        """Create staff roles with appropriate permissions"""
-        roles_created = []
-        
-        # Admin role
-        admin_role = discord.utils.get(guild.roles, name="Admin")
-        if not admin_role:
-            admin_role = await guild.create_role(
-                name="Admin",
-                color=discord.Color.red(),
-                permissions=discord.Permissions(
-                    administrator=True
-                ),
-                hoist=True,
-                mentionable=True,
-                reason="Staff role creation"
-            )
-            roles_created.append(admin_role)
-        
-        # Moderator role
-        mod_role = discord.utils.get(guild.roles, name="Moderator")
-        if not mod_role:
-            mod_role = await guild.create_role(
-                name="Moderator",
-                color=discord.Color.orange(),
-                permissions=discord.Permissions(
-                    kick_members=True,
-                    ban_members=True,
-                    manage_messages=True,
-                    moderate_members=True,
-                    manage_channels=True,
-                    view_audit_log=True,
-                    read_messages=True,
-                    send_messages=True,
-                    manage_roles=True
-                ),
-                hoist=True,
-                mentionable=True,
-                reason="Staff role creation"
-            )
-            roles_created.append(mod_role)
-        
-        # Helper role
-        helper_role = discord.utils.get(guild.roles, name="Helper")
-        if not helper_role:
-            helper_role = await guild.create_role(
-                name="Helper",
-                color=discord.Color.green(),
-                permissions=discord.Permissions(
-                    manage_messages=True,
-                    read_messages=True,
-                    send_messages=True
-                ),
-                hoist=True,
-                mentionable=True,
-                reason="Staff role creation"
-            )
-            roles_created.append(helper_role)
-        
-        return roles_created
+    def _staff_overwrites(self, guild: discord.Guild) -> Dict[Union[discord.Role, discord.Member], discord.PermissionOverwrite]:
+        """Get the @everyone and staff role overwrites shared by every ticket channel"""
+        overwrites = self._ticket_overwrites.get(guild.id)
+        if overwrites is None:
+            overwrites = {guild.default_role: discord.PermissionOverwrite(view_channel=False)}
+            for name in STAFF_ROLES:
+                role = get_role_by_name(guild, name)
+                if role:
+                    overwrites[role] = discord.PermissionOverwrite(view_channel=True)
+            self._ticket_overwrites[guild.id] = overwrites
+        return overwrites
     
     @commands.Cog.listener()
-    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
-        """Handle ticket creation reactions"""
-        # Ignore bot reactions
-        if payload.user_id == self.bot.user.id:
-            return
-        
-        guild = self.bot.get_guild(payload.guild_id)
-        if not guild:
-            return
-        
-        # Check if this is the ticket message
-        ticket_msg_id = self.dm.get_guild_config_value(guild.id, 'ticket_message_id')
-        if not ticket_msg_id or payload.message_id != ticket_msg_id:
-            return
-        
-        # Check if reaction is the ticket emoji
-        if str(payload.emoji) != "🎫":
-            return
-        
-        member = guild.get_member(payload.user_id)
-        if not member:
-            return
-        
-        # Remove the reaction
-        channel = guild.get_channel(payload.channel_id)
-        if channel:
-            message = await channel.fetch_message(payload.message_id)
-            await message.remove_reaction(payload.emoji, member)
-        
-        # Create ticket
-        await self._create_ticket(guild, member)
+    async def on_guild_role_create(self, role: discord.Role):
+        self._ticket_overwrites.pop(role.guild.id, None)
+    
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        if before.name != after.name:
+            self._ticket_overwrites.pop(after.guild.id, None)
     
-    async def _create_ticket(self, guild: discord.Guild, member: discord.Member):
-        """Create a support ticket for a member"""
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        self._ticket_overwrites.pop(role.guild.id, None)
+    
+    async def _create_ticket(self, guild: discord.Guild, member: discord.Member) -> Tuple[discord.TextChannel, bool]:
+        """Create a support ticket for a member
+        
+        Returns the ticket channel and whether it was created, or the member's
+        existing ticket and False.
+        """
         # Check if user already has an open ticket
-        existing_tickets = self.dm.get_guild_config_value(guild.id, 'open_tickets', {})
+        existing_tickets = await self.dm.get_guild_config_value(guild.id, 'open_tickets', {})
         
         if str(member.id) in existing_tickets:
-            ticket_ch_id = existing_tickets[str(member.id)]
-            ticket_ch = guild.get_channel(ticket_ch_id)
+            ticket_ch = guild.get_channel(existing_tickets[str(member.id)])
             if ticket_ch:
-                try:
-                    await member.send(
-                        f"❌ You already have an open ticket: {ticket_ch.mention}\n"
-                        f"Please use that channel or close it first before creating a new one."
-                    )
-                except discord.Forbidden:
-                    pass
-                return
+                return ticket_ch, False
         
         # Get ticket category
-        category_id = self.dm.get_guild_config_value(guild.id, 'ticket_category_id')
+        category_id = await self.dm.get_guild_config_value(guild.id, 'ticket_category_id')
         category = guild.get_channel(category_id) if category_id else None
         
         # Get ticket number
-        ticket_number = self.dm.get_guild_config_value(guild.id, 'ticket_counter', 0) + 1
-        self.dm.set_guild_config(guild.id, 'ticket_counter', ticket_number)
+        ticket_number = await self.dm.modify_guild_config(guild.id, _next_ticket_number)
         
-        # Get staff roles
-        admin_role = discord.utils.get(guild.roles, name="Admin")
-        mod_role = discord.utils.get(guild.roles, name="Moderator")
-        helper_role = discord.utils.get(guild.roles, name="Helper")
+        # Create ticket channel with its permissions in one call, so it is never public
+        overwrites = dict(self._staff_overwrites(guild))
+        overwrites[member] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
         
-        # Create ticket channel
         ticket_channel = await guild.create_text_channel(
             f"ticket-{ticket_number:04d}",
             category=category,
             topic=f"Support ticket for {member.display_name}",
+            overwrites=overwrites,
             reason=f"Support ticket created by {member}"
         )
         
-        # Set permissions
-        await ticket_channel.set_permissions(guild.default_role, view_channel=False)
-        await ticket_channel.set_permissions(member, view_channel=True, send_messages=True)
-        
-        if admin_role:
-            await ticket_channel.set_permissions(admin_role, view_channel=True)
-        if mod_role:
-            await ticket_channel.set_permissions(mod_role, view_channel=True)
-        if helper_role:
-            await ticket_channel.set_permissions(helper_role, view_channel=True)
+        mod_role = get_role_by_name(guild, "Moderator")
         
         # Send ticket message
         embed = discord.Embed(
@@ -517,7 +344,7 @@ class ServerSetup(commands.Cog):
             description=(
                 f"Welcome {member.mention}!\n\n"
                 f"A staff member will be with you shortly. Please describe your issue in detail.\n\n"
-                f"To close this ticket, react with 🔒 or use `!closeticket`"
+                f"To close this ticket, click **Close Ticket** or use `!closeticket`"
             ),
             color=discord.Color.green()
         )
@@ -525,27 +352,14 @@ class ServerSetup(commands.Cog):
         
         ticket_msg = await ticket_channel.send(
             content=f"{member.mention} | Staff: {mod_role.mention if mod_role else '@Staff'}",
-            embed=embed
+            embed=embed,
+            view=TicketControlView(self)
         )
-        await ticket_msg.add_reaction("🔒")
         
-        # Save ticket info
-        existing_tickets[str(member.id)] = ticket_channel.id
-        self.dm.set_guild_config(guild.id, 'open_tickets', existing_tickets)
-        
-        # Save ticket message ID
-        ticket_data = self.dm.get_guild_config_value(guild.id, 'ticket_messages', {})
-        ticket_data[str(ticket_channel.id)] = ticket_msg.id
-        self.dm.set_guild_config(guild.id, 'ticket_messages', ticket_data)
-        
-        # Notify user
-        try:
-            await member.send(
-                f"✅ Your support ticket has been created: {ticket_channel.mention}\n"
-                f"A staff member will assist you shortly."
-            )
-        except discord.Forbidden:
-            pass
+        # Save ticket info and ticket message ID
+        async with self.dm.transaction(guild.id) as config:
+            config.setdefault('open_tickets', {})[str(member.id)] = ticket_channel.id
+            config.setdefault('ticket_messages', {})[str(ticket_channel.id)] = ticket_msg.id
         
         # Log
         await log_action(
@@ -553,6 +367,38 @@ class ServerSetup(commands.Cog):
             f"🎫 {member.mention} created ticket #{ticket_number:04d}",
             discord.Color.blue()
         )
+        
+        return ticket_channel, True
+    
+    @commands.command(name="ticketpanel")
+    @is_owner()
+    async def ticket_panel(self, ctx):
+        """Switch a ticket panel posted before buttons existed over to the Create Ticket button
+        
+        Usage: !ticketpanel
+        """
+        config = await self.dm.get_guild_config(ctx.guild.id)
+        channel = ctx.guild.get_channel(config.get('ticket_channel_id', 0))
+        if not channel or not config.get('ticket_message_id'):
+            await ctx.send("❌ No ticket panel found. Run `!fullsetup` first.")
+            return
+        
+        try:
+            message = await channel.fetch_message(config['ticket_message_id'])
+        except discord.NotFound:
+            await ctx.send("❌ The ticket panel message no longer exists.")
+            return
+        
+        embed = message.embeds[0] if message.embeds else None
+        if embed and embed.description:
+            embed.description = embed.description.replace(
+                "React with 🎫 below to create a ticket.",
+                "Click **Create Ticket** below to open a ticket."
+            )
+        
+        await message.edit(embed=embed, view=TicketPanelView(self))
+        await message.clear_reactions()
+        await ctx.send(f"✅ The ticket panel in {channel.mention} now uses buttons.")
     
     @commands.command(name="closeticket")
     async def close_ticket(self, ctx):
@@ -570,7 +416,7 @@ class ServerSetup(commands.Cog):
     async def _close_ticket_channel(self, guild: discord.Guild, channel: discord.TextChannel, closer: discord.Member):
         """Close a ticket channel"""
         # Find the ticket owner
-        open_tickets = self.dm.get_guild_config_value(guild.id, 'open_tickets', {})
+        open_tickets = await self.dm.get_guild_config_value(guild.id, 'open_tickets', {})
         
         ticket_owner_id = None
         for user_id, ch_id in open_tickets.items():
@@ -588,23 +434,19 @@ class ServerSetup(commands.Cog):
         
         # Remove from open tickets
         if ticket_owner_id:
-            del open_tickets[str(ticket_owner_id)]
-            self.dm.set_guild_config(guild.id, 'open_tickets', open_tickets)
-        
-        # Delete channel after 5 seconds
-        await channel.delete(delay=5, reason=f"Ticket closed by {closer}")
+            async with self.dm.transaction(guild.id) as config:
+                config.get('open_tickets', {}).pop(str(ticket_owner_id), None)
+                config.get('ticket_messages', {}).pop(str(channel.id), None)
         
         # Notify user
         if ticket_owner_id:
-            member = guild.get_member(ticket_owner_id)
+            member = await get_or_fetch_member(guild, ticket_owner_id)
             if member:
-                try:
-                    await member.send(
-                        f"🔒 Your support ticket in **{guild.name}** has been closed by {closer.display_name}.\n"
-                        f"If you need further assistance, feel free to create a new ticket."
-                    )
-                except discord.Forbidden:
-                    pass
+                self.bot.dms.send(
+                    member,
+                    f"🔒 Your support ticket in **{guild.name}** has been closed by {closer.display_name}.\n"
+                    f"If you need further assistance, feel free to create a new ticket."
+                )
         
         # Log
         await log_action(
@@ -612,6 +454,13 @@ class ServerSetup(commands.Cog):
             f"🔒 {closer.mention} closed ticket: {channel.name}",
             discord.Color.orange()
         )
+        
+        # Delete channel after 5 seconds
+        await asyncio.sleep(5)
+        try:
+            await channel.delete(reason=f"Ticket closed by {closer}")
+        except discord.NotFound:
+            pass  # Already deleted
 
 
 async def setup(bot):
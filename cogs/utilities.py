@@ -1,21 +1,26 @@
+import time
+import asyncio
 import discord
 from discord.ext import commands
-import platform
-import psutil
 from datetime import datetime
-from utils.data_manager import DataManager
 from utils.helpers import send_embed, get_log_channel
 from discord import app_commands
 from discord import Object, Color, Interaction
 
 
+# Seconds a fetched bot count is reused when the member cache is trimmed
+BOT_COUNT_TTL = 6 * 3600
+
+
 class Utilities(commands.Cog):
     """Utility commands for general use"""
     
     def __init__(self, bot):
         self.bot = bot
-        self.dm = DataManager()
+        self.dm = bot.dm
         self.start_time = datetime.utcnow()
+        # guild_id -> (monotonic time, bot count) for guilds that are not chunked
+        self._bot_counts = {}
     
     @app_commands.command(name="ping", description="Check bot latency")
     async def ping(self, interaction: Interaction):
@@ -41,9 +46,15 @@ class Utilities(commands.Cog):
         minutes, seconds = divmod(remainder, 60)
         days, hours = divmod(hours, 24)
         
-        # Get system info
-        memory = psutil.virtual_memory()
-        cpu_percent = psutil.cpu_percent(interval=1)
+        # Get system info, importing psutil and platform only when !info is used
+        import platform
+        try:
+            import psutil
+            memory = f"{psutil.virtual_memory().percent}%"
+            # Sampling takes a second, so keep it off the event loop
+            cpu_percent = f"{await asyncio.to_thread(psutil.cpu_percent, 1)}%"
+        except ImportError:
+            memory = cpu_percent = "N/A"
         
         fields = [
             {
@@ -60,8 +71,8 @@ class Utilities(commands.Cog):
             },
             {
                 'name': '💻 System',
-                'value': f"**CPU:** {cpu_percent}%\n"
-                        f"**RAM:** {memory.percent}%\n"
+                'value': f"**CPU:** {cpu_percent}\n"
+                        f"**RAM:** {memory}\n"
                         f"**Python:** {platform.python_version()}",
                 'inline': True
             },
@@ -96,8 +107,8 @@ class Utilities(commands.Cog):
         categories = len(guild.categories)
         
         # Count members
-        humans = sum(1 for m in guild.members if not m.bot)
-        bots = sum(1 for m in guild.members if m.bot)
+        bots = await self._count_bots(ctx, guild)
+        humans = (guild.member_count or 0) - bots
         
         fields = [
             {
@@ -128,7 +139,7 @@ class Utilities(commands.Cog):
             },
             {
                 'name': '👑 Owner',
-                'value': guild.owner.mention if guild.owner else "Unknown",
+                'value': f"<@{guild.owner_id}>" if guild.owner_id else "Unknown",
                 'inline': True
             },
             {
@@ -147,6 +158,20 @@ class Utilities(commands.Cog):
             ephemeral=True
         )
     
+    async def _count_bots(self, ctx, guild: discord.Guild) -> int:
+        """Count a guild's bots, paging the member list at most once per BOT_COUNT_TTL when it isn't cached"""
+        if guild.chunked:
+            return sum(1 for m in guild.members if m.bot)
+        
+        cached = self._bot_counts.get(guild.id)
+        if cached and time.monotonic() - cached[0] < BOT_COUNT_TTL:
+            return cached[1]
+        
+        async with ctx.typing():
+            bots = sum([m.bot async for m in guild.fetch_members(limit=None)])
+        self._bot_counts[guild.id] = (time.monotonic(), bots)
+        return bots
+    
     @commands.command(name="userinfo", aliases=["whois"])
     async def user_info(self, ctx, member: discord.Member = None):
         """Display user information
@@ -154,13 +179,19 @@ class Utilities(commands.Cog):
         Usage: !userinfo [@user]
         """
         member = member or ctx.author
+        if member.joined_at is None:
+            # Partial member data from a trimmed cache, fetch the full member
+            try:
+                member = await ctx.guild.fetch_member(member.id)
+            except discord.HTTPException:
+                pass
         
         # Get roles (excluding @everyone)
         roles = [role.mention for role in member.roles if role.name != "@everyone"]
         roles_str = ", ".join(roles) if roles else "None"
         
         # Get user stats
-        stats = self.dm.get_user_stats(member.id)
+        stats = await self.dm.get_user_stats(member.id)
         
         fields = [
             {
@@ -203,7 +234,7 @@ class Utilities(commands.Cog):
         
         Usage: !mymodules
         """
-        stats = self.dm.get_user_stats(ctx.author.id)
+        stats = await self.dm.get_user_stats(ctx.author.id)
         modules = stats.get('modules', [])
         
         if not modules:
@@ -0,0 +1,48 @@
+import json
+import hashlib
+import discord
+from discord import app_commands
+from typing import Any, Dict, List, Optional
+from utils.helpers import load_json, save_json, DATA_DIR
+
+
+FINGERPRINT_FILE = f"{DATA_DIR}/command_tree.json"
+
+
+def _command_payload(tree: app_commands.CommandTree, command: Any) -> Dict[str, Any]:
+    try:
+        return command.to_dict(tree)
+    except TypeError:
+        # discord.py < 2.4 takes no tree argument
+        return command.to_dict()
+
+
+def tree_fingerprint(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> str:
+    """Hash the payload a sync would upload for the global or a guild's commands"""
+    payload = sorted(
+        (_command_payload(tree, command) for command in tree.get_commands(guild=guild)),
+        key=lambda command: (command.get('type', 1), command['name'])
+    )
+    serialized = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def _scope(application_id: int, guild: Optional[discord.abc.Snowflake]) -> str:
+    return f"{application_id}:{guild.id if guild else 'global'}"
+
+
+async def sync_tree(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> List[app_commands.AppCommand]:
+    """Sync commands to Discord and remember the fingerprint of what was synced"""
+    synced = await tree.sync(guild=guild)
+    fingerprints = load_json(FINGERPRINT_FILE, {})
+    fingerprints[_scope(tree.client.application_id, guild)] = tree_fingerprint(tree, guild)
+    save_json(FINGERPRINT_FILE, fingerprints)
+    return synced
+
+
+async def sync_if_changed(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> Optional[List[app_commands.AppCommand]]:
+    """Sync only if the commands differ from the last sync, returning None when skipped"""
+    fingerprints = load_json(FINGERPRINT_FILE, {})
+    if fingerprints.get(_scope(tree.client.application_id, guild)) == tree_fingerprint(tree, guild):
+        return None
+    return await sync_tree(tree, guild)
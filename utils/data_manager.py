@@ -1,10 +1,112 @@
 import os
 import json
-from typing import Dict, List, Any, Optional
-from datetime import datetime
-from utils.helpers import load_json, save_json, DATA_DIR
+import copy
+import bisect
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, asynccontextmanager
+from typing import Dict, List, Any, Optional, Tuple, Callable, Union, FrozenSet
+from datetime import datetime, timedelta, date as Date
+from functools import wraps, partial
+from utils.helpers import (
+    load_json, save_json, file_lock, is_write_pending, last_written_signature, DATA_DIR
+)
 
 OWNER = os.getenv("OWNER_USERNAME")
+DATA_BACKEND = os.getenv("DATA_BACKEND", "json").lower()
+
+
+class DataWriteError(Exception):
+    """A data file could not be saved"""
+
+
+def locked(path_attr: str):
+    """Hold a data file's lock for the whole read-modify-write of a method"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with file_lock(getattr(self, path_attr)):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def parse_event_date(value: str) -> Optional[Date]:
+    """Parse an event's YYYY-MM-DD date, or None if it is malformed"""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
+
+class EventIndex:
+    """In-memory indexes over the events document
+    
+    Keeps event keys per module, per (module, date), and in date order with
+    dates parsed once, plus an ID allocator that starts past every ID in the
+    document. DataManager persists the allocator so IDs of deleted events are
+    not handed out again either.
+    """
+    
+    def __init__(self, events: Dict[str, Any]):
+        self.by_module: Dict[str, List[str]] = {}
+        self.by_module_date: Dict[Tuple[str, str], List[str]] = {}
+        self.by_date: List[Tuple[Date, str]] = []
+        self.undated: List[str] = []
+        self.dates: Dict[str, Date] = {}
+        self.next_id = 0
+        
+        for key, event in events.items():
+            self.add(key, event)
+    
+    def add(self, key: str, event: Dict[str, Any]):
+        """Index an event"""
+        module = event.get('module')
+        self.by_module.setdefault(module, []).append(key)
+        self.by_module_date.setdefault((module, event.get('date')), []).append(key)
+        
+        parsed = parse_event_date(event.get('date'))
+        if parsed is None:
+            self.undated.append(key)
+        else:
+            self.dates[key] = parsed
+            bisect.insort(self.by_date, (parsed, key))
+        
+        suffix = key.rsplit('::', 1)[-1]
+        if suffix.isdigit():
+            self.next_id = max(self.next_id, int(suffix) + 1)
+    
+    def remove(self, key: str, event: Dict[str, Any]):
+        """Drop an event from the indexes"""
+        module = event.get('module')
+        self.by_module.get(module, []).remove(key)
+        self.by_module_date.get((module, event.get('date')), []).remove(key)
+        
+        parsed = self.dates.pop(key, None)
+        if parsed is None:
+            self.undated.remove(key)
+        else:
+            del self.by_date[bisect.bisect_left(self.by_date, (parsed, key))]
+    
+    def allocate_id(self) -> int:
+        """Get a fresh event ID"""
+        self.next_id += 1
+        return self.next_id - 1
+    
+    def between(self, start: Date, end: Date) -> List[str]:
+        """Keys of events dated from start to end inclusive, in date order"""
+        lo = bisect.bisect_left(self.by_date, (start, ''))
+        hi = bisect.bisect_left(self.by_date, (end + timedelta(days=1), ''))
+        return [key for _, key in self.by_date[lo:hi]]
+    
+    def ordered(self, module: str = None) -> List[str]:
+        """Keys in date order, with malformed dates last"""
+        keys = [key for _, key in self.by_date] + self.undated
+        if module:
+            wanted = set(self.by_module.get(module, []))
+            keys = [key for key in keys if key in wanted]
+        return keys
 
 
 class DataManager:
@@ -13,59 +115,165 @@ class DataManager:
     ADMINS_FILE = f"{DATA_DIR}/admins.json"
     MODULES_FILE = f"{DATA_DIR}/modules.json"
     EVENTS_FILE = f"{DATA_DIR}/events.json"
+    # Next event ID, kept apart from events.json so deleting the newest event doesn't free its ID
+    EVENTS_META_FILE = f"{DATA_DIR}/events_meta.json"
     GUILD_CONFIG_FILE = f"{DATA_DIR}/guild_config.json"
     USER_STATS_FILE = f"{DATA_DIR}/user_stats.json"
     
     def __init__(self):
+        # path -> ((mtime_ns, size), parsed document)
+        self._cache: Dict[str, Tuple[Optional[Tuple[int, int]], Any]] = {}
+        # Admin permission index, rebuilt whenever admins.json is reloaded or changed
+        self._admins_doc: Optional[List[Union[int, str]]] = None
+        self._admin_ids: FrozenSet[int] = frozenset()
+        self._admin_names: FrozenSet[str] = frozenset()
+        # Event indexes, rebuilt whenever events.json is reloaded
+        self._events_doc: Optional[Dict[str, Any]] = None
+        self._event_index: Optional[EventIndex] = None
         self._ensure_files()
     
     def _ensure_files(self):
         """Ensure all data files exist"""
         os.makedirs(DATA_DIR, exist_ok=True)
     
+    # ==================== CACHE ====================
+    
+    @staticmethod
+    def _signature(path: str) -> Optional[Tuple[int, int]]:
+        """Return the (mtime, size) of a file, or None if it is missing"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+    
+    def _read(self, path: str, default: Any) -> Any:
+        """Return the cached document for a file, reloading it only if it changed on disk"""
+        cached = self._cache.get(path)
+        if cached is not None:
+            # Deferred writes are newer than whatever is on disk
+            if is_write_pending(path):
+                return cached[1]
+            
+            signature = self._signature(path)
+            if signature is not None and cached[0] == signature:
+                return cached[1]
+            
+            # The file changed because a deferred write of ours was flushed
+            if signature is not None and signature == last_written_signature(path):
+                self._cache[path] = (signature, cached[1])
+                return cached[1]
+        
+        data = load_json(path, default)
+        self._cache[path] = (self._signature(path), data)
+        return data
+    
+    def _write(self, path: str, data: Any) -> bool:
+        """Write a document through the cache to disk"""
+        if save_json(path, data):
+            self._cache[path] = (self._signature(path), data)
+            return True
+        
+        # Drop the entry so the next read falls back to what is on disk
+        self._cache.pop(path, None)
+        return False
+    
+    def invalidate(self, path: str = None):
+        """Forget cached documents so they are reloaded on next access"""
+        if path is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(path, None)
+    
     # ==================== ADMINS ====================
     
-    def get_admins(self) -> List[str]:
-        """Get list of bot admins"""
-        return load_json(self.ADMINS_FILE, [OWNER])
+    # admins.json holds user IDs. Entries that are still username strings are
+    # legacy admins, replaced by their ID the first time they use an admin command.
     
-    def add_admin(self, username: str) -> bool:
-        """Add an admin"""
-        admins = self.get_admins()
-        if username not in admins:
-            admins.append(username)
-            return save_json(self.ADMINS_FILE, admins)
+    def _load_admins(self) -> List[Union[int, str]]:
+        """Read the admin list and rebuild the permission index if it changed"""
+        admins = self._read(self.ADMINS_FILE, [OWNER])
+        if admins is not self._admins_doc:
+            self._index_admins(admins)
+        return admins
+    
+    def _index_admins(self, admins: List[Union[int, str]]):
+        """Rebuild the in-memory admin ID and legacy username sets"""
+        self._admins_doc = admins
+        self._admin_ids = frozenset(a for a in admins if isinstance(a, int))
+        self._admin_names = frozenset(a for a in admins if isinstance(a, str))
+    
+    def _save_admins(self, admins: List[Union[int, str]]) -> bool:
+        """Write the admin list and refresh the permission index"""
+        if self._write(self.ADMINS_FILE, admins):
+            self._index_admins(admins)
+            return True
+        
+        self._admins_doc = None
+        return False
+    
+    def get_admins(self) -> List[Union[int, str]]:
+        """Get list of bot admins (user IDs, plus any legacy usernames)"""
+        return list(self._load_admins())
+    
+    @locked("ADMINS_FILE")
+    def add_admin(self, user: Union[int, str]) -> bool:
+        """Add an admin by user ID"""
+        admins = self._load_admins()
+        if user not in admins:
+            admins.append(user)
+            return self._save_admins(admins)
         return False
     
-    def remove_admin(self, username: str) -> bool:
+    @locked("ADMINS_FILE")
+    def remove_admin(self, user: Union[int, str]) -> bool:
         """Remove an admin (cannot remove owner)"""
-        if username == OWNER:
+        if user == OWNER:
             return False
         
-        admins = self.get_admins()
-        if username in admins:
-            admins.remove(username)
-            return save_json(self.ADMINS_FILE, admins)
+        admins = self._load_admins()
+        if user in admins:
+            admins.remove(user)
+            return self._save_admins(admins)
         return False
     
-    def is_admin(self, username: str) -> bool:
-        """Check if user is admin"""
-        return username in self.get_admins()
+    def is_admin(self, user_id: int) -> bool:
+        """Check if a user ID is an admin, rereading admins.json only if it changed"""
+        self._load_admins()
+        return user_id in self._admin_ids
+    
+    def is_legacy_admin(self, username: str) -> bool:
+        """Check if a username is listed as an admin that has no ID yet"""
+        self._load_admins()
+        return username in self._admin_names
+    
+    @locked("ADMINS_FILE")
+    def migrate_admin(self, username: str, user_id: int) -> bool:
+        """Replace a legacy admin username with the user's ID"""
+        admins = self._load_admins()
+        if username not in admins:
+            return False
+        
+        admins.remove(username)
+        if user_id not in admins:
+            admins.append(user_id)
+        return self._save_admins(admins)
     
     # ==================== MODULES ====================
     
     def get_modules(self) -> Dict[str, Any]:
         """Get all modules"""
-        return load_json(self.MODULES_FILE, {})
+        return copy.deepcopy(self._read(self.MODULES_FILE, {}))
     
     def get_module(self, code: str) -> Optional[Dict[str, Any]]:
         """Get a specific module"""
-        modules = self.get_modules()
-        return modules.get(code.upper())
+        modules = self._read(self.MODULES_FILE, {})
+        return copy.deepcopy(modules.get(code.upper()))
     
+    @locked("MODULES_FILE")
     def add_module(self, code: str, data: Dict[str, Any] = None) -> bool:
         """Add a new module"""
-        modules = self.get_modules()
+        modules = self._read(self.MODULES_FILE, {})
         code = code.upper()
         
         if code in modules:
@@ -76,51 +284,108 @@ class DataManager:
         
         data['created'] = str(datetime.utcnow())
         modules[code] = data
-        return save_json(self.MODULES_FILE, modules)
+        return self._write(self.MODULES_FILE, modules)
+    
+    @locked("MODULES_FILE")
+    def add_modules(self, new_modules: Dict[str, Dict[str, Any]]) -> List[str]:
+        """Add several modules with one write and return the codes that were added"""
+        modules = self._read(self.MODULES_FILE, {})
+        created = str(datetime.utcnow())
+        
+        added = []
+        for code, data in new_modules.items():
+            code = code.upper()
+            if code in modules:
+                continue
+            modules[code] = dict(data or {}, created=created)
+            added.append(code)
+        
+        if added and not self._write(self.MODULES_FILE, modules):
+            return []
+        return added
     
+    @locked("MODULES_FILE")
     def remove_module(self, code: str) -> bool:
         """Remove a module"""
-        modules = self.get_modules()
+        modules = self._read(self.MODULES_FILE, {})
         code = code.upper()
         
         if code in modules:
             del modules[code]
-            return save_json(self.MODULES_FILE, modules)
+            return self._write(self.MODULES_FILE, modules)
         return False
     
+    @locked("MODULES_FILE")
+    def remove_modules(self, codes: List[str]) -> List[str]:
+        """Remove several modules with one write and return the codes that were removed"""
+        modules = self._read(self.MODULES_FILE, {})
+        removed = [code.upper() for code in codes if modules.pop(code.upper(), None) is not None]
+        
+        if removed and not self._write(self.MODULES_FILE, modules):
+            return []
+        return removed
+    
+    @locked("MODULES_FILE")
     def update_module(self, code: str, data: Dict[str, Any]) -> bool:
         """Update module data"""
-        modules = self.get_modules()
+        modules = self._read(self.MODULES_FILE, {})
         code = code.upper()
         
         if code not in modules:
             return False
         
         modules[code].update(data)
-        return save_json(self.MODULES_FILE, modules)
+        return self._write(self.MODULES_FILE, modules)
     
     def module_exists(self, code: str) -> bool:
         """Check if module exists"""
-        return code.upper() in self.get_modules()
+        return code.upper() in self._read(self.MODULES_FILE, {})
     
     # ==================== EVENTS ====================
     
+    def _load_events(self) -> Tuple[Dict[str, Any], EventIndex]:
+        """Read the events document and rebuild its index if it changed"""
+        events = self._read(self.EVENTS_FILE, {})
+        if events is not self._events_doc:
+            self._events_doc = events
+            self._event_index = EventIndex(events)
+        return events, self._event_index
+    
     def get_events(self, module: str = None) -> Dict[str, Any]:
         """Get all events or events for a specific module"""
-        all_events = load_json(self.EVENTS_FILE, {})
+        all_events, index = self._load_events()
         
         if module:
-            module = module.upper()
-            return {k: v for k, v in all_events.items() if v.get('module') == module}
+            keys = index.by_module.get(module.upper(), [])
+            return {k: copy.deepcopy(all_events[k]) for k in keys}
         
-        return all_events
+        return copy.deepcopy(all_events)
     
+    def get_events_sorted(self, module: str = None) -> List[Tuple[str, Dict[str, Any], Optional[Date]]]:
+        """Get (key, event, date) for all or one module's events in date order
+        
+        Events with a malformed date come last with a date of None.
+        """
+        all_events, index = self._load_events()
+        keys = index.ordered(module.upper() if module else None)
+        return [(k, copy.deepcopy(all_events[k]), index.dates.get(k)) for k in keys]
+    
+    def get_events_between(self, start: Date, end: Date) -> List[Tuple[str, Dict[str, Any], Date]]:
+        """Get (key, event, date) for events dated from start to end inclusive, in date order"""
+        all_events, index = self._load_events()
+        return [(k, copy.deepcopy(all_events[k]), index.dates[k]) for k in index.between(start, end)]
+    
+    @locked("EVENTS_FILE")
     def add_event(self, module: str, date: str, description: str, **kwargs) -> str:
         """Add an event and return its key"""
-        events = load_json(self.EVENTS_FILE, {})
+        events, index = self._load_events()
         module = module.upper()
         
-        key = f"{module}::{date}::{len(events)}"
+        meta = self._read(self.EVENTS_META_FILE, {})
+        index.next_id = max(index.next_id, meta.get('next_id', 0))
+        key = f"{module}::{date}::{index.allocate_id()}"
+        # Reserve the ID before saving the event, so a failed save can't lead to reuse
+        self._write(self.EVENTS_META_FILE, {**meta, 'next_id': index.next_id})
         
         events[key] = {
             'module': module,
@@ -129,78 +394,125 @@ class DataManager:
             'created': str(datetime.utcnow()),
             **kwargs
         }
+        index.add(key, events[key])
         
-        save_json(self.EVENTS_FILE, events)
+        self._write(self.EVENTS_FILE, events)
         return key
     
+    @locked("EVENTS_FILE")
     def remove_event(self, key: str) -> bool:
         """Remove an event by key"""
-        events = load_json(self.EVENTS_FILE, {})
+        events, index = self._load_events()
         
         if key in events:
-            del events[key]
-            return save_json(self.EVENTS_FILE, events)
+            index.remove(key, events.pop(key))
+            return self._write(self.EVENTS_FILE, events)
         return False
     
     def find_event(self, module: str, date: str) -> Optional[str]:
         """Find event key by module and date"""
-        events = load_json(self.EVENTS_FILE, {})
-        module = module.upper()
-        
-        for key, event in events.items():
-            if event.get('module') == module and event.get('date') == date:
-                return key
-        return None
+        _, index = self._load_events()
+        keys = index.by_module_date.get((module.upper(), date))
+        return keys[0] if keys else None
     
     # ==================== GUILD CONFIG ====================
     
     def get_guild_config(self, guild_id: int) -> Dict[str, Any]:
         """Get configuration for a guild"""
-        all_configs = load_json(self.GUILD_CONFIG_FILE, {})
-        return all_configs.get(str(guild_id), {})
+        all_configs = self._read(self.GUILD_CONFIG_FILE, {})
+        return copy.deepcopy(all_configs.get(str(guild_id), {}))
     
+    @locked("GUILD_CONFIG_FILE")
     def set_guild_config(self, guild_id: int, key: str, value: Any) -> bool:
         """Set a configuration value for a guild"""
-        all_configs = load_json(self.GUILD_CONFIG_FILE, {})
+        all_configs = self._read(self.GUILD_CONFIG_FILE, {})
         guild_id = str(guild_id)
         
         if guild_id not in all_configs:
             all_configs[guild_id] = {}
         
         all_configs[guild_id][key] = value
-        return save_json(self.GUILD_CONFIG_FILE, all_configs)
+        return self._write(self.GUILD_CONFIG_FILE, all_configs)
     
     def get_guild_config_value(self, guild_id: int, key: str, default: Any = None) -> Any:
         """Get a specific config value for a guild"""
-        config = self.get_guild_config(guild_id)
-        return config.get(key, default)
+        all_configs = self._read(self.GUILD_CONFIG_FILE, {})
+        config = all_configs.get(str(guild_id), {})
+        return copy.deepcopy(config.get(key, default))
+    
+    def _begin_guild_config(self, guild_id: int) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Read all configs and a working copy of one guild's, under the config file lock"""
+        all_configs = self._read(self.GUILD_CONFIG_FILE, {})
+        return all_configs, copy.deepcopy(all_configs.get(str(guild_id), {}))
+    
+    def _commit_guild_config(self, all_configs: Dict[str, Any], guild_id: int, config: Dict[str, Any]) -> bool:
+        """Save a guild's edited config if it changed and return whether it is saved"""
+        if config == all_configs.get(str(guild_id), {}):
+            return True
+        all_configs[str(guild_id)] = config
+        return self._write(self.GUILD_CONFIG_FILE, all_configs)
+    
+    @contextmanager
+    def transaction(self, guild_id: int):
+        """Edit a guild's config in place and save every change with one write
+        
+        Nothing is saved if the block raises. Raises DataWriteError if the save fails.
+        """
+        with file_lock(self.GUILD_CONFIG_FILE):
+            all_configs, config = self._begin_guild_config(guild_id)
+            yield config
+            if not self._commit_guild_config(all_configs, guild_id, config):
+                raise DataWriteError(f"Failed to save config for guild {guild_id}")
+    
+    def update_guild_config(self, guild_id: int, **changes: Any) -> bool:
+        """Set several configuration values for a guild with one write"""
+        with file_lock(self.GUILD_CONFIG_FILE):
+            all_configs, config = self._begin_guild_config(guild_id)
+            config.update(changes)
+            return self._commit_guild_config(all_configs, guild_id, config)
+    
+    def modify_guild_config(self, guild_id: int, func: Callable[[Dict[str, Any]], Any]) -> Any:
+        """Apply func to a guild's config atomically and return its result
+        
+        Raises DataWriteError if the change could not be saved.
+        """
+        with file_lock(self.GUILD_CONFIG_FILE):
+            all_configs, config = self._begin_guild_config(guild_id)
+            result = func(config)
+            if not self._commit_guild_config(all_configs, guild_id, config):
+                raise DataWriteError(f"Failed to save config for guild {guild_id}")
+            return result
     
     # ==================== USER STATS ====================
     
     def get_user_stats(self, user_id: int) -> Dict[str, Any]:
         """Get stats for a user"""
-        all_stats = load_json(self.USER_STATS_FILE, {})
-        return all_stats.get(str(user_id), {
+        all_stats = self._read(self.USER_STATS_FILE, {})
+        if str(user_id) in all_stats:
+            return copy.deepcopy(all_stats[str(user_id)])
+        return {
             'messages': 0,
             'commands_used': 0,
             'joined_at': None,
             'modules': []
-        })
+        }
     
+    @locked("USER_STATS_FILE")
     def update_user_stat(self, user_id: int, key: str, value: Any) -> bool:
         """Update a user stat"""
-        all_stats = load_json(self.USER_STATS_FILE, {})
+        all_stats = self._read(self.USER_STATS_FILE, {})
         user_id = str(user_id)
         
         if user_id not in all_stats:
             all_stats[user_id] = self.get_user_stats(int(user_id))
         
         all_stats[user_id][key] = value
-        return save_json(self.USER_STATS_FILE, all_stats)
+        return self._write(self.USER_STATS_FILE, all_stats)
     
+    @locked("USER_STATS_FILE")
     def increment_user_stat(self, user_id: int, key: str, amount: int = 1) -> bool:
         """Increment a numeric user stat"""
-        all_stats = load_json(self.USER_STATS_FILE, {})
+        all_stats = self._read(self.USER_STATS_FILE, {})
         user_id = str(user_id)
         
         if user_id not in all_stats:
@@ -208,11 +520,12 @@ class DataManager:
         
         current = all_stats[user_id].get(key, 0)
         all_stats[user_id][key] = current + amount
-        return save_json(self.USER_STATS_FILE, all_stats)
+        return self._write(self.USER_STATS_FILE, all_stats)
     
+    @locked("USER_STATS_FILE")
     def add_user_module(self, user_id: int, module: str) -> bool:
         """Add a module to user's list"""
-        all_stats = load_json(self.USER_STATS_FILE, {})
+        all_stats = self._read(self.USER_STATS_FILE, {})
         user_id = str(user_id)
         module = module.upper()
         
@@ -224,6 +537,154 @@ class DataManager:
         
         if module not in all_stats[user_id]['modules']:
             all_stats[user_id]['modules'].append(module)
-            return save_json(self.USER_STATS_FILE, all_stats)
+            return self._write(self.USER_STATS_FILE, all_stats)
+        
+        return False
+    
+    @locked("USER_STATS_FILE")
+    def remove_user_module(self, user_id: int, module: str) -> bool:
+        """Remove a module from user's list"""
+        all_stats = self._read(self.USER_STATS_FILE, {})
+        user_id = str(user_id)
+        module = module.upper()
+        
+        modules = all_stats.get(user_id, {}).get('modules', [])
+        if module in modules:
+            modules.remove(module)
+            return self._write(self.USER_STATS_FILE, all_stats)
+        
+        return False
+    
+    @locked("USER_STATS_FILE")
+    def update_user_modules(self, user_id: int, add: List[str], remove: List[str]) -> bool:
+        """Add and remove modules from a user's list in one locked update"""
+        all_stats = self._read(self.USER_STATS_FILE, {})
+        user_id = str(user_id)
+        remove = {module.upper() for module in remove}
+        
+        if user_id not in all_stats:
+            all_stats[user_id] = self.get_user_stats(int(user_id))
+        
+        modules = [module for module in all_stats[user_id].get('modules', []) if module not in remove]
+        modules += [module for module in dict.fromkeys(module.upper() for module in add) if module not in modules]
+        all_stats[user_id]['modules'] = modules
+        return self._write(self.USER_STATS_FILE, all_stats)
+    
+    @locked("USER_STATS_FILE")
+    def purge_user_modules(self, modules: List[str]) -> int:
+        """Remove modules from every user's list with one write and return how many users changed"""
+        all_stats = self._read(self.USER_STATS_FILE, {})
+        modules = {module.upper() for module in modules}
+        
+        changed = 0
+        for stats in all_stats.values():
+            joined = stats.get('modules', [])
+            kept = [module for module in joined if module not in modules]
+            if len(kept) != len(joined):
+                stats['modules'] = kept
+                changed += 1
+        
+        if changed and not self._write(self.USER_STATS_FILE, all_stats):
+            return 0
+        return changed
+
+
+def create_data_manager():
+    """Create the data manager for the configured storage backend"""
+    if DATA_BACKEND == "sqlite":
+        from utils.sqlite_manager import SQLiteDataManager
+        return SQLiteDataManager()
+    return DataManager()
+
+
+# One single-threaded executor per data domain, shared by every AsyncDataManager,
+# so calls touching the same file run in submission order
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def _get_executor(domain: str) -> ThreadPoolExecutor:
+    """Get the worker thread for a data domain"""
+    with _executors_lock:
+        if domain not in _executors:
+            _executors[domain] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"data-{domain}")
+        return _executors[domain]
+
+
+def shutdown_data_workers():
+    """Wait for queued data operations to finish and stop the worker threads"""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    
+    for executor in executors:
+        executor.shutdown(wait=True)
+
+
+class AsyncDataManager:
+    """Awaitable DataManager facade that runs disk work off the event loop"""
+    
+    DOMAINS = {
+        'admins': ('get_admins', 'add_admin', 'remove_admin', 'is_admin', 'migrate_admin'),
+        'modules': (
+            'get_modules', 'get_module', 'add_module', 'add_modules',
+            'remove_module', 'remove_modules', 'update_module', 'module_exists'
+        ),
+        'events': (
+            'get_events', 'get_events_sorted', 'get_events_between',
+            'add_event', 'remove_event', 'find_event'
+        ),
+        'guild_config': (
+            'get_guild_config', 'set_guild_config', 'get_guild_config_value',
+            'update_guild_config', 'modify_guild_config'
+        ),
+        'user_stats': (
+            'get_user_stats', 'update_user_stat', 'increment_user_stat',
+            'add_user_module', 'remove_user_module', 'update_user_modules',
+            'purge_user_modules'
+        ),
+    }
+    
+    def __init__(self, manager=None):
+        self.sync = manager or create_data_manager()
+        # guild_id -> lock held by an open transaction() on that guild's config
+        self._guild_locks: Dict[int, asyncio.Lock] = {}
+        self._routes = {name: domain for domain, names in self.DOMAINS.items() for name in names}
+    
+    def __getattr__(self, name: str):
+        routes = self.__dict__.get('_routes', {})
+        if name not in routes:
+            raise AttributeError(f"{type(self).__name__} has no attribute {name!r}")
+        
+        return partial(self._call, routes[name], getattr(self.sync, name))
+    
+    async def _call(self, domain: str, func, *args, **kwargs):
+        """Run a DataManager method on its domain's worker thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(domain), partial(func, *args, **kwargs))
+    
+    @asynccontextmanager
+    async def transaction(self, guild_id: int):
+        """Edit a guild's config across awaits and save the changes with one write
         
-        return False
\ No newline at end of file
+        Transactions on the same guild run one at a time, so interleaved
+        coroutines cannot overwrite each other's changes.
+        """
+        lock = self._guild_locks.setdefault(guild_id, asyncio.Lock())
+        async with lock:
+            config = await self.get_guild_config(guild_id)
+            before = copy.deepcopy(config)
+            
+            yield config
+            
+            changed = {k: v for k, v in config.items() if k not in before or before[k] != v}
+            removed = [k for k in before if k not in config]
+            if not changed and not removed:
+                return
+            
+            def apply(current: Dict[str, Any]):
+                current.update(changed)
+                for key in removed:
+                    current.pop(key, None)
+            
+            await self.modify_guild_config(guild_id, apply)
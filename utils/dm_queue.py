@@ -0,0 +1,120 @@
+import os
+import time
+import asyncio
+import logging
+import discord
+from collections import Counter
+from typing import Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two DMs, across all users
+DM_INTERVAL = float(os.getenv("DM_INTERVAL", "0.5"))
+# How long a user with closed DMs is skipped before we try them again
+CLOSED_DM_TTL = 24 * 3600
+# Discord's message length limit
+MAX_DM_LENGTH = 2000
+
+
+class DMQueue:
+    """Delivers direct messages in the background at a steady pace
+
+    Handlers enqueue and return immediately. Messages for a user that has not
+    been reached yet are merged into one DM and exact repeats are dropped. Users
+    whose DMs are closed are remembered and skipped for CLOSED_DM_TTL.
+    """
+
+    def __init__(self, interval: float = DM_INTERVAL):
+        self.interval = interval
+        self.stats = Counter()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        # user_id -> (recipient, lines waiting to be sent)
+        self._pending: Dict[int, Tuple[Union[discord.User, discord.Member], List[str]]] = {}
+        # user_id -> time their DMs were found closed
+        self._closed: Dict[int, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def backlog(self) -> int:
+        """Users with messages waiting to be sent"""
+        return len(self._pending)
+
+    @property
+    def closed(self) -> int:
+        """Users currently skipped because their DMs are closed"""
+        return len(self._closed)
+
+    def start(self):
+        """Start the delivery loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 5.0):
+        """Try to deliver what is queued, then stop the delivery loop"""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropping {self.backlog} queued DMs on shutdown")
+        self._task.cancel()
+        self._task = None
+
+    def _is_closed(self, user_id: int) -> bool:
+        closed_at = self._closed.get(user_id)
+        if closed_at is None:
+            return False
+        if time.monotonic() - closed_at > CLOSED_DM_TTL:
+            del self._closed[user_id]
+            return False
+        return True
+
+    def send(self, user: Union[discord.User, discord.Member], content: str) -> bool:
+        """Queue a DM and return whether it will be attempted"""
+        if self._is_closed(user.id):
+            self.stats['skipped'] += 1
+            return False
+
+        pending = self._pending.get(user.id)
+        if pending is None:
+            self._pending[user.id] = (user, [content])
+            self._queue.put_nowait(user.id)
+        elif content in pending[1]:
+            self.stats['deduplicated'] += 1
+        else:
+            pending[1].append(content)
+            self.stats['merged'] += 1
+        return True
+
+    async def _run(self):
+        while True:
+            user_id = await self._queue.get()
+            try:
+                user, lines = self._pending.pop(user_id)
+                await self._deliver(user, lines)
+            except Exception as e:
+                logger.error(f"Error delivering DM: {e}", exc_info=e)
+            finally:
+                self._queue.task_done()
+            await asyncio.sleep(self.interval)
+
+    async def _deliver(self, user: Union[discord.User, discord.Member], lines: List[str]):
+        """Send a user's merged lines, splitting at the message length limit"""
+        chunks = [""]
+        for line in lines:
+            if chunks[-1] and len(chunks[-1]) + len(line) + 2 > MAX_DM_LENGTH:
+                chunks.append("")
+            chunks[-1] = f"{chunks[-1]}\n\n{line}" if chunks[-1] else line[:MAX_DM_LENGTH]
+
+        for chunk in chunks:
+            try:
+                await user.send(chunk)
+                self.stats['sent'] += 1
+            except discord.Forbidden:
+                self._closed[user.id] = time.monotonic()
+                self.stats['forbidden'] += 1
+                return
+            except discord.HTTPException as e:
+                self.stats['failed'] += 1
+                logger.warning(f"Failed to DM {user}: {e}")
+                return
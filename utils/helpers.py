@@ -1,22 +1,61 @@
 from discord.ext import commands
 import os
 import json
+import atexit
 import discord
+import threading
 from functools import wraps
-from typing import Union, Any, Dict, List, Optional
+from typing import Union, Any, Dict, List, Optional, Tuple
 from discord import Object, Color, Interaction, Message
+from utils.name_index import name_index
+from utils.log_sink import LogSink
 
 
 DATA_DIR = "data"
 LOG_CHANNEL_NAME = os.getenv("LOG_CHANNEL_NAME", "server-logs")
+# Seconds to hold back JSON writes so bursts collapse into one (0 = write immediately)
+WRITE_BEHIND_INTERVAL = float(os.getenv("WRITE_BEHIND_INTERVAL", "0"))
 
 # Ensure data directory exists
 os.makedirs(DATA_DIR, exist_ok=True)
 
+# Write-behind state: path -> (sequence, document) waiting to be flushed, and the flush timer
+_pending_writes: Dict[str, Tuple[int, Any]] = {}
+_pending_sequence = 0
+_pending_lock = threading.Lock()
+_flush_timer: Optional[threading.Timer] = None
+
+# Per-file locks and the (mtime, size) of the last write we made to each file
+_file_locks: Dict[str, threading.RLock] = {}
+_file_locks_guard = threading.Lock()
+_written_signatures: Dict[str, Tuple[int, int]] = {}
+
+
+def file_lock(path: str) -> threading.RLock:
+    """Get the lock guarding a data file"""
+    with _file_locks_guard:
+        if path not in _file_locks:
+            _file_locks[path] = threading.RLock()
+        return _file_locks[path]
+
+
+def is_write_pending(path: str) -> bool:
+    """Check if a file has changes that have not been flushed yet"""
+    return path in _pending_writes
+
+
+def last_written_signature(path: str) -> Optional[Tuple[int, int]]:
+    """Get the (mtime, size) of the file as left by our last write"""
+    return _written_signatures.get(path)
+
 
 def load_json(path: str, default: Any) -> Any:
     """Load JSON file with default fallback"""
     try:
+        pending = _pending_writes.get(path)
+        if pending is not None:
+            return pending[1]
+        
         if not os.path.exists(path):
             save_json(path, default)
             return default
@@ -33,20 +72,76 @@ def load_json(path: str, default: Any) -> Any:
 
 
 def save_json(path: str, data: Any) -> bool:
-    """Save data to JSON file"""
+    """Save data to JSON file, deferring the write when write-behind is enabled"""
+    if WRITE_BEHIND_INTERVAL <= 0:
+        return _write_json(path, data)
+    
+    global _pending_sequence
+    with _pending_lock:
+        _pending_sequence += 1
+        _pending_writes[path] = (_pending_sequence, data)
+        _schedule_flush()
+    return True
+
+
+def _schedule_flush():
+    """Start the flush timer if it isn't running; call with _pending_lock held"""
+    global _flush_timer
+    if _flush_timer is None:
+        _flush_timer = threading.Timer(WRITE_BEHIND_INTERVAL, flush_pending_writes)
+        _flush_timer.daemon = True
+        _flush_timer.start()
+
+
+def _write_json(path: str, data: Any) -> bool:
+    """Write data to JSON file now"""
     try:
-        with open(path, 'w') as f:
-            json.dump(data, f, indent=2)
+        with file_lock(path):
+            with open(path, 'w') as f:
+                json.dump(data, f, indent=2)
+            st = os.stat(path)
+            _written_signatures[path] = (st.st_mtime_ns, st.st_size)
         return True
     except Exception as e:
         print(f"Error saving {path}: {e}")
         return False
 
 
+def flush_pending_writes() -> int:
+    """Write every deferred document to disk and return how many were written
+    
+    Documents that fail to write stay pending and are retried on the next flush.
+    """
+    global _flush_timer
+    with _pending_lock:
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+        pending = list(_pending_writes.items())
+    
+    written = 0
+    for path, (sequence, data) in pending:
+        if not _write_json(path, data):
+            continue
+        written += 1
+        with _pending_lock:
+            # Only forget the entry if nothing newer was queued meanwhile
+            if _pending_writes.get(path, (None,))[0] == sequence:
+                del _pending_writes[path]
+    
+    with _pending_lock:
+        if _pending_writes:
+            _schedule_flush()
+    return written
+
+
+atexit.register(flush_pending_writes)
+
+
 async def get_log_channel(guild: discord.Guild) -> Optional[discord.TextChannel]:
     """Get or create the log channel"""
     try:
-        ch = discord.utils.get(guild.text_channels, name=LOG_CHANNEL_NAME)
+        ch = name_index.get_log_channel(guild, LOG_CHANNEL_NAME)
         if not ch:
             ch = await guild.create_text_channel(
                 LOG_CHANNEL_NAME,
@@ -61,19 +156,13 @@ async def get_log_channel(guild: discord.Guild) -> Optional[discord.TextChannel]
         return None
 
 
+# Batches log_action calls per guild; flushed by the bot on close
+log_sink = LogSink(get_log_channel)
+
+
 async def log_action(guild: discord.Guild, message: str, color: discord.Color = discord.Color.blue()):
     """Log an action to the log channel"""
-    try:
-        log_ch = await get_log_channel(guild)
-        if log_ch:
-            embed = discord.Embed(
-                description=message,
-                color=color,
-                timestamp=discord.utils.utcnow()
-            )
-            await log_ch.send(embed=embed)
-    except Exception as e:
-        print(f"Error logging action: {e}")
+    await log_sink.add(guild, message, color)
 
 
 def is_owner():
@@ -83,31 +172,62 @@ def is_owner():
     return discord.ext.commands.check(predicate)
 
 
+async def check_admin(bot, user: Union[discord.User, discord.Member]) -> bool:
+    """Check if a user is a bot admin, linking a legacy username entry to their ID"""
+    if bot.dm.sync.is_admin(user.id):
+        return True
+    
+    if bot.dm.sync.is_legacy_admin(str(user)):
+        await bot.dm.migrate_admin(str(user), user.id)
+        return True
+    
+    return False
+
+
+def get_role_by_name(guild: discord.Guild, name: str) -> Optional[discord.Role]:
+    """Get a role by name through the guild's name index"""
+    return name_index.get_role(guild, name)
+
+
+def get_channel_by_name(guild: discord.Guild, name: str) -> Optional[discord.TextChannel]:
+    """Get a text channel by name through the guild's name index"""
+    return name_index.get_text_channel(guild, name)
+
+
+def get_category_by_name(guild: discord.Guild, name: str) -> Optional[discord.CategoryChannel]:
+    """Get a category by name through the guild's name index"""
+    return name_index.get_category(guild, name)
+
+
+async def get_or_fetch_member(guild: discord.Guild, user_id: int) -> Optional[discord.Member]:
+    """Get a member from the cache, fetching them when the member cache is trimmed"""
+    member = guild.get_member(user_id)
+    if member is None:
+        try:
+            member = await guild.fetch_member(user_id)
+        except (discord.NotFound, discord.HTTPException):
+            return None
+    return member
+
+
 def is_admin():
     """Check if user is an admin"""
     async def predicate(ctx):
-        from utils.data_manager import DataManager
-        dm = DataManager()
-        admins = dm.get_admins()
-        return str(ctx.author) in admins
+        return await check_admin(ctx.bot, ctx.author)
     return discord.ext.commands.check(predicate)
 
 
 def is_admin_or_has_role(role_name: str = "Admin"):
     """Check if user is bot admin or has specific role"""
     async def predicate(ctx):
-        from utils.data_manager import DataManager
-        dm = DataManager()
-        admins = dm.get_admins()
-        
         # Check bot admin list
-        if str(ctx.author) in admins:
+        if await check_admin(ctx.bot, ctx.author):
             return True
         
         # Check for role
         if ctx.guild:
-            role = discord.utils.get(ctx.guild.roles, name=role_name)
-            if role and role in ctx.author.roles:
+            role = get_role_by_name(ctx.guild, role_name)
+            if role and ctx.author.get_role(role.id):
                 return True
         
         return False
@@ -0,0 +1,64 @@
+import os
+import re
+import sys
+import glob
+import subprocess
+from typing import List, Tuple
+
+
+# Directory holding bot.py, cogs/ and utils/
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# "import time:       123 |        456 |   discord.abc"
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+
+
+def project_modules() -> List[str]:
+    """bot plus every module under utils/ and cogs/ (except this profiler)"""
+    modules = ["bot"]
+    for package in ("utils", "cogs"):
+        for path in sorted(glob.glob(os.path.join(PROJECT_DIR, package, "*.py"))):
+            name = os.path.splitext(os.path.basename(path))[0]
+            if name not in ("__init__", "import_profile"):
+                modules.append(f"{package}.{name}")
+    return modules
+
+
+def measure_imports(modules: List[str]) -> List[Tuple[str, int, int]]:
+    """Import modules in a fresh interpreter under -X importtime
+
+    Returns (module, self µs, cumulative µs) for every module imported.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        cwd=PROJECT_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            entries.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return entries
+
+
+def profile_imports(modules: List[str] = None, top: int = 15) -> List[str]:
+    """Summarise where import time goes, for the log"""
+    modules = modules or project_modules()
+    entries = measure_imports(modules)
+    total = sum(self_us for _, self_us, _ in entries)
+
+    lines = [f"Imported {len(entries)} modules in {total / 1000:.0f}ms"]
+    lines.append("Project modules (cumulative):")
+    own = [entry for entry in entries if entry[0] == "bot" or entry[0].startswith(("utils.", "cogs."))]
+    for name, _, cumulative in sorted(own, key=lambda entry: -entry[2]):
+        lines.append(f"  {cumulative / 1000:7.1f}ms  {name}")
+    lines.append(f"Slowest {top} modules (self):")
+    for name, self_us, _ in sorted(entries, key=lambda entry: -entry[1])[:top]:
+        lines.append(f"  {self_us / 1000:7.1f}ms  {name}")
+    return lines
+
+
+if __name__ == "__main__":
+    print("\n".join(profile_imports()))
@@ -0,0 +1,102 @@
+import os
+import asyncio
+import discord
+from datetime import datetime
+from typing import Dict, List, Tuple, Callable, Awaitable, Optional
+
+# Seconds to buffer log actions per guild before posting them (0 = post immediately)
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "2"))
+# Discord limits: embeds per message, characters per description and per message
+MAX_EMBEDS = 10
+MAX_DESCRIPTION = 4096
+MAX_MESSAGE_CHARS = 6000
+
+LogEntry = Tuple[str, discord.Color, datetime]
+
+
+def pack_entries(entries: List[LogEntry]) -> List[List[discord.Embed]]:
+    """Merge log entries into as few embeds and messages as Discord's limits allow
+
+    Consecutive entries of the same colour share one embed, one line each.
+    Returns the embeds grouped per message.
+    """
+    # Each group is the entries sharing one embed and their rendered lines
+    groups: List[Tuple[List[LogEntry], List[str]]] = []
+    length = 0
+    for entry in entries:
+        message, color, when = entry
+        line = f"<t:{int(when.timestamp())}:T> {message}"[:MAX_DESCRIPTION]
+        # Joined lines are separated by a newline
+        if groups and groups[-1][0][0][1] == color and length + 1 + len(line) <= MAX_DESCRIPTION:
+            groups[-1][0].append(entry)
+            groups[-1][1].append(line)
+            length += 1 + len(line)
+        else:
+            groups.append(([entry], [line]))
+            length = len(line)
+
+    embeds = []
+    for group, lines in groups:
+        if len(group) == 1:
+            description = group[0][0][:MAX_DESCRIPTION]
+        else:
+            description = "\n".join(lines)
+        embeds.append(discord.Embed(description=description, color=group[0][1], timestamp=group[-1][2]))
+
+    messages: List[List[discord.Embed]] = []
+    size = 0
+    for embed in embeds:
+        if not messages or len(messages[-1]) == MAX_EMBEDS or size + len(embed.description) > MAX_MESSAGE_CHARS:
+            messages.append([])
+            size = 0
+        messages[-1].append(embed)
+        size += len(embed.description)
+    return messages
+
+
+class LogSink:
+    """Buffers log-channel actions per guild and posts them in batches"""
+
+    def __init__(self, resolve_channel: Callable[[discord.Guild], Awaitable[Optional[discord.TextChannel]]], interval: float = LOG_FLUSH_INTERVAL):
+        self.resolve_channel = resolve_channel
+        self.interval = interval
+        self._entries: Dict[int, List[LogEntry]] = {}
+        self._guilds: Dict[int, discord.Guild] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    async def add(self, guild: discord.Guild, message: str, color: discord.Color):
+        """Queue an action for the guild's log channel"""
+        self._entries.setdefault(guild.id, []).append((message, color, discord.utils.utcnow()))
+        self._guilds[guild.id] = guild
+
+        if self.interval <= 0:
+            await self.flush(guild.id)
+        elif guild.id not in self._tasks:
+            self._tasks[guild.id] = asyncio.create_task(self._flush_later(guild.id))
+
+    async def _flush_later(self, guild_id: int):
+        await asyncio.sleep(self.interval)
+        self._tasks.pop(guild_id, None)
+        await self.flush(guild_id)
+
+    async def flush(self, guild_id: int):
+        """Post a guild's buffered actions now"""
+        entries = self._entries.pop(guild_id, None)
+        guild = self._guilds.pop(guild_id, None)
+        if not entries or not guild:
+            return
+
+        try:
+            channel = await self.resolve_channel(guild)
+            if channel:
+                for embeds in pack_entries(entries):
+                    await channel.send(embeds=embeds)
+        except Exception as e:
+            print(f"Error logging action: {e}")
+
+    async def close(self):
+        """Post everything still buffered, e.g. on shutdown"""
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        await asyncio.gather(*(self.flush(guild_id) for guild_id in list(self._entries)))
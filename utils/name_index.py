@@ -0,0 +1,139 @@
+import discord
+from typing import Dict, Optional, Set, Union
+
+
+def _kind(channel: discord.abc.GuildChannel) -> Optional[str]:
+    """Index bucket for a channel type"""
+    if isinstance(channel, discord.CategoryChannel):
+        return 'category'
+    if isinstance(channel, discord.VoiceChannel):
+        return 'voice'
+    if isinstance(channel, discord.TextChannel):
+        return 'text'
+    return None
+
+
+class NameIndex:
+    """Per-guild name -> ID index for channels and roles
+
+    Built when a guild becomes available and kept current from channel and role
+    events. Every hit is checked against the guild cache, so a missed event only
+    costs one linear scan before the entry is corrected. Names that are not found
+    are remembered as misses until a channel or role with that name is created
+    or renamed into place.
+    """
+
+    def __init__(self):
+        # guild_id -> bucket ('text', 'voice', 'category', 'role') -> name -> id
+        self._names: Dict[int, Dict[str, Dict[str, int]]] = {}
+        # guild_id -> bucket -> names known to be missing
+        self._misses: Dict[int, Dict[str, Set[str]]] = {}
+        # guild_id -> log channel ID stored by !fullsetup
+        self._log_channels: Dict[int, int] = {}
+
+    # ==================== MAINTENANCE ====================
+
+    def build(self, guild: discord.Guild):
+        """Index every channel and role in a guild"""
+        buckets = {'text': {}, 'voice': {}, 'category': {}, 'role': {}}
+        # guild.channels is in cache order, so sort it the way guild.text_channels
+        # and friends are; reversed so the first by position wins, like discord.utils.get
+        for channel in sorted(guild.channels, key=lambda c: (c.position, c.id), reverse=True):
+            kind = _kind(channel)
+            if kind:
+                buckets[kind][channel.name] = channel.id
+        for role in reversed(guild.roles):
+            buckets['role'][role.name] = role.id
+        self._names[guild.id] = buckets
+        self._misses[guild.id] = {kind: set() for kind in buckets}
+
+    def forget_guild(self, guild_id: int):
+        """Drop a guild the bot has left"""
+        self._names.pop(guild_id, None)
+        self._misses.pop(guild_id, None)
+        self._log_channels.pop(guild_id, None)
+
+    def add(self, obj: Union[discord.abc.GuildChannel, discord.Role]):
+        """Index a created channel or role"""
+        kind = 'role' if isinstance(obj, discord.Role) else _kind(obj)
+        buckets = self._names.get(obj.guild.id)
+        if kind and buckets is not None:
+            buckets[kind].setdefault(obj.name, obj.id)
+            self._misses[obj.guild.id][kind].discard(obj.name)
+
+    def remove(self, obj: Union[discord.abc.GuildChannel, discord.Role], name: str = None):
+        """Unindex a deleted or renamed channel or role"""
+        if name is None and self._log_channels.get(obj.guild.id) == obj.id:
+            del self._log_channels[obj.guild.id]
+
+        kind = 'role' if isinstance(obj, discord.Role) else _kind(obj)
+        buckets = self._names.get(obj.guild.id)
+        name = obj.name if name is None else name
+        if kind and buckets is not None and buckets[kind].get(name) == obj.id:
+            del buckets[kind][name]
+
+    def rename(self, before: Union[discord.abc.GuildChannel, discord.Role], after: Union[discord.abc.GuildChannel, discord.Role]):
+        """Move an entry when a channel or role is renamed"""
+        if before.name != after.name:
+            self.remove(after, name=before.name)
+            self.add(after)
+
+    def set_log_channel(self, guild_id: int, channel_id: Optional[int]):
+        """Remember the configured log channel for a guild"""
+        if channel_id:
+            self._log_channels[guild_id] = channel_id
+        else:
+            self._log_channels.pop(guild_id, None)
+
+    # ==================== LOOKUPS ====================
+
+    def _resolve(self, guild: discord.Guild, kind: str, name: str, getter, candidates):
+        buckets = self._names.get(guild.id)
+        if buckets is None:
+            self.build(guild)
+            buckets = self._names[guild.id]
+        misses = self._misses[guild.id][kind]
+        if name in misses:
+            return None
+
+        obj_id = buckets[kind].get(name)
+        obj = getter(obj_id) if obj_id else None
+        if obj is not None and obj.name == name:
+            return obj
+
+        # Stale or missing entry: fall back to a scan and repair the index
+        obj = discord.utils.get(candidates, name=name)
+        if obj:
+            buckets[kind][name] = obj.id
+        else:
+            buckets[kind].pop(name, None)
+            misses.add(name)
+        return obj
+
+    def get_text_channel(self, guild: discord.Guild, name: str) -> Optional[discord.TextChannel]:
+        """Get a text channel by name"""
+        return self._resolve(guild, 'text', name, guild.get_channel, guild.text_channels)
+
+    def get_voice_channel(self, guild: discord.Guild, name: str) -> Optional[discord.VoiceChannel]:
+        """Get a voice channel by name"""
+        return self._resolve(guild, 'voice', name, guild.get_channel, guild.voice_channels)
+
+    def get_category(self, guild: discord.Guild, name: str) -> Optional[discord.CategoryChannel]:
+        """Get a category by name"""
+        return self._resolve(guild, 'category', name, guild.get_channel, guild.categories)
+
+    def get_role(self, guild: discord.Guild, name: str) -> Optional[discord.Role]:
+        """Get a role by name"""
+        return self._resolve(guild, 'role', name, guild.get_role, guild.roles)
+
+    def get_log_channel(self, guild: discord.Guild, name: str) -> Optional[discord.TextChannel]:
+        """Get the configured log channel, falling back to the channel called name"""
+        channel_id = self._log_channels.get(guild.id)
+        channel = guild.get_channel(channel_id) if channel_id else None
+        if isinstance(channel, discord.TextChannel):
+            return channel
+        return self.get_text_channel(guild, name)
+
+
+# Shared by the bot's event listeners and every lookup helper
+name_index = NameIndex()
@@ -0,0 +1,89 @@
+import os
+import csv
+import asyncio
+from typing import List, Tuple
+
+
+# Header cells that mark the first CSV row as column names
+HEADER_CODES = {"CODE", "MODULE", "MODULE CODE"}
+
+
+def parse_module_list(text: str) -> List[Tuple[str, str]]:
+    """Parse module codes and names from CSV rows or "CODE Name" lines"""
+    entries = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        if "," in line:
+            row = next(csv.reader([line]))
+            code, name = row[0], row[1] if len(row) > 1 else ""
+        else:
+            code, _, name = line.partition(" ")
+
+        code = code.strip().upper()
+        if not code or code in HEADER_CODES:
+            continue
+        entries.setdefault(code, name.strip() or code)
+
+    return list(entries.items())
+
+
+async def _provision(guild_id: int, entries: List[Tuple[str, str]]):
+    import discord
+    from cogs.modules import Modules
+    from utils.data_manager import AsyncDataManager, create_data_manager
+
+    client = discord.Client(intents=discord.Intents.default())
+    client.dm = AsyncDataManager(create_data_manager())
+
+    @client.event
+    async def on_ready():
+        try:
+            guild = client.get_guild(guild_id)
+            if not guild:
+                print(f"Guild {guild_id} not found")
+                return
+
+            async def progress(done: int, total: int, code: str):
+                print(f"[{done}/{total}] {code}")
+
+            results = await Modules(client).provision_modules(guild, entries, progress)
+            print(f"Created {len(results['created'])}, skipped {len(results['skipped'])}, failed {len(results['failed'])}")
+            for failure in results['failed']:
+                print(f"  ✗ {failure}")
+        finally:
+            await client.close()
+
+    async with client:
+        await client.start(os.getenv("DISCORD_TOKEN"))
+
+
+def main():
+    """Create modules from a CSV or text file without running the full bot"""
+    import argparse
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Create modules in bulk")
+    parser.add_argument("guild_id", type=int, help="Server to create the modules in")
+    parser.add_argument("file", nargs="?", help="CSV or text file of module codes and names (omit to resume)")
+    args = parser.parse_args()
+
+    entries = []
+    if args.file:
+        with open(args.file, encoding="utf-8-sig") as f:
+            entries = parse_module_list(f.read())
+
+    from utils.helpers import flush_pending_writes
+    from utils.data_manager import shutdown_data_workers
+    try:
+        asyncio.run(_provision(args.guild_id, entries))
+    finally:
+        shutdown_data_workers()
+        flush_pending_writes()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import os
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Hashable, List, Tuple
+
+
+# Discord REST calls the bot issues at once across all buckets
+API_CONCURRENCY = int(os.getenv("API_CONCURRENCY", "8"))
+# Calls in flight per rate-limit bucket (e.g. channel creation in one guild)
+API_BUCKET_CONCURRENCY = int(os.getenv("API_BUCKET_CONCURRENCY", "4"))
+
+
+class RateLimiter:
+    """Bounds concurrent REST calls globally and per rate-limit bucket
+
+    discord.py still handles 429 retries; the limiter keeps bursts small enough
+    that they rarely happen. Buckets are arbitrary keys such as
+    ("channels", guild.id) mirroring Discord's per-route, per-guild buckets.
+    """
+
+    def __init__(self, concurrency: int = API_CONCURRENCY, per_bucket: int = API_BUCKET_CONCURRENCY):
+        self.per_bucket = max(1, per_bucket)
+        self._global = asyncio.Semaphore(max(1, concurrency))
+        self._buckets: Dict[Hashable, asyncio.Semaphore] = {}
+
+    def _bucket(self, key: Hashable) -> asyncio.Semaphore:
+        if key not in self._buckets:
+            self._buckets[key] = asyncio.Semaphore(self.per_bucket)
+        return self._buckets[key]
+
+    @asynccontextmanager
+    async def limit(self, bucket: Hashable):
+        """Hold a slot in a bucket and in the global pool"""
+        async with self._bucket(bucket):
+            async with self._global:
+                yield
+
+    async def call(self, bucket: Hashable, coro_func, *args, **kwargs):
+        """Await coro_func(*args, **kwargs) inside a bucket slot"""
+        async with self.limit(bucket):
+            return await coro_func(*args, **kwargs)
+
+
+class StepTimer:
+    """Records how long each named step of an operation took"""
+
+    def __init__(self):
+        self.steps: List[Tuple[str, float]] = []
+        self._started = time.perf_counter()
+
+    @asynccontextmanager
+    async def step(self, name: str):
+        """Time the enclosed block as one step"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((name, time.perf_counter() - start))
+
+    @property
+    def total(self) -> float:
+        """Seconds since the timer was created"""
+        return time.perf_counter() - self._started
+
+    def summary(self) -> str:
+        """One line per step plus the total"""
+        lines = [f"{name}: {seconds:.2f}s" for name, seconds in self.steps]
+        lines.append(f"total: {self.total:.2f}s")
+        return "\n".join(lines)
+
+
+# Shared so concurrent commands in the same guild respect the same buckets
+rate_limiter = RateLimiter()
@@ -0,0 +1,53 @@
+import discord
+from collections import Counter
+from typing import Dict, Optional, Tuple, Callable, Awaitable
+
+
+ReactionHandler = Callable[[discord.RawReactionActionEvent], Awaitable[None]]
+
+
+class ReactionDispatcher:
+    """Routes raw reaction events to the handlers registered for their message
+
+    The bot receives every reaction in every guild; a single dict lookup drops
+    the ones no cog cares about before any other work is done.
+    """
+
+    def __init__(self):
+        # message_id -> (handler for adds, handler for removes)
+        self._routes: Dict[int, Tuple[Optional[ReactionHandler], Optional[ReactionHandler]]] = {}
+        self.stats = Counter()
+
+    def register(self, message_id: int, on_add: ReactionHandler = None, on_remove: ReactionHandler = None):
+        """Route reactions on a message to the given handlers"""
+        self._routes[message_id] = (on_add, on_remove)
+
+    def unregister(self, message_id: int):
+        """Stop routing reactions on a message"""
+        self._routes.pop(message_id, None)
+
+    def unregister_owner(self, owner: object):
+        """Drop every route whose handlers are methods of owner, e.g. an unloading cog"""
+        for message_id, handlers in list(self._routes.items()):
+            if any(getattr(handler, '__self__', None) is owner for handler in handlers):
+                del self._routes[message_id]
+
+    @property
+    def routes(self) -> int:
+        """Number of messages with registered handlers"""
+        return len(self._routes)
+
+    async def dispatch(self, payload: discord.RawReactionActionEvent, added: bool, bot_user_id: int):
+        """Hand a reaction event to its handler, or count it as dropped"""
+        if payload.user_id == bot_user_id:
+            self.stats['own'] += 1
+            return
+
+        handlers = self._routes.get(payload.message_id)
+        handler = handlers[0 if added else 1] if handlers else None
+        if handler is None:
+            self.stats['dropped'] += 1
+            return
+
+        self.stats['routed'] += 1
+        await handler(payload)
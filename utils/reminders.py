@@ -0,0 +1,196 @@
+import os
+import heapq
+import asyncio
+import logging
+import discord
+from typing import Dict, List, Any, Tuple, Set, Optional, Callable, Awaitable
+from datetime import datetime, date, time, timedelta
+
+logger = logging.getLogger(__name__)
+
+# Days before an event that reminders go out (7 = a week before, 0 = on the day)
+DEFAULT_REMINDER_OFFSETS = [7, 1, 0]
+# Hour of the day (bot's local time) at which reminders are sent
+REMINDER_HOUR = int(os.getenv("REMINDER_HOUR", "8"))
+# Reminders missed while the bot was offline are still sent if this recent
+CATCH_UP_WINDOW = timedelta(hours=24)
+# Upper bound on a single sleep so clock changes are noticed
+MAX_SLEEP = 3600
+
+
+def reminder_heading(offset: int) -> str:
+    """Heading for a batch of reminders sent offset days before the events"""
+    if offset == 0:
+        return "🔴 **Events TODAY:**"
+    if offset == 1:
+        return "⚠️ **Events TOMORROW:**"
+    if offset == 7:
+        return "📅 **Events in 1 week:**"
+    return f"📅 **Events in {offset} days:**"
+
+
+class ReminderScheduler:
+    """Sends event reminders at precise times from a min-heap of due instants
+
+    Each heap entry is (due, guild_id, event_key, offset). Delivered reminders
+    are recorded in the guild's `sent_reminders` config so restarts never send
+    them twice.
+    """
+
+    def __init__(self, bot, deliver: Callable[[discord.Guild, int, List[Dict[str, Any]]], Awaitable[bool]]):
+        self.bot = bot
+        self.dm = bot.dm
+        self.deliver = deliver
+        self._heap: List[Tuple[datetime, int, str, int]] = []
+        # event_key -> (event, date) for events that may still need reminders
+        self._events: Dict[str, Tuple[Dict[str, Any], date]] = {}
+        # guild_id -> offsets and {event_key: offsets already sent}
+        self._offsets: Dict[int, List[int]] = {}
+        self._sent: Dict[int, Dict[str, Set[int]]] = {}
+        self._wake = asyncio.Event()
+        # Keeps a rebuild from re-queueing reminders that are being delivered
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the scheduler loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        """Stop the scheduler loop"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    @property
+    def pending(self) -> int:
+        """Number of reminders waiting in the heap"""
+        return len(self._heap)
+
+    async def rebuild(self):
+        """Reload events and guild settings and rebuild the heap"""
+        async with self._lock:
+            await self._rebuild()
+
+    async def _rebuild(self):
+        yesterday = date.today() - timedelta(days=1)
+        self._events = {
+            key: (event, event_date)
+            for key, event, event_date in await self.dm.get_events_sorted()
+            if event_date is not None and event_date >= yesterday
+        }
+
+        self._offsets.clear()
+        self._sent.clear()
+        for guild in self.bot.guilds:
+            await self._load_guild(guild.id)
+
+        self._heap = []
+        for key in self._events:
+            self._push_event(key)
+        heapq.heapify(self._heap)
+        self._wake.set()
+
+    async def _load_guild(self, guild_id: int):
+        """Load a guild's reminder offsets and sent history, dropping stale history"""
+        config = await self.dm.get_guild_config(guild_id)
+        self._offsets[guild_id] = config.get('reminder_offsets', DEFAULT_REMINDER_OFFSETS)
+
+        sent = config.get('sent_reminders', {})
+        self._sent[guild_id] = {key: set(offsets) for key, offsets in sent.items() if key in self._events}
+
+        if len(self._sent[guild_id]) != len(sent):
+            live = {key: sorted(offsets) for key, offsets in self._sent[guild_id].items()}
+            await self.dm.update_guild_config(guild_id, sent_reminders=live)
+
+    def _push_event(self, key: str):
+        """Queue every reminder still due for an event"""
+        event_date = self._events[key][1]
+        cutoff = datetime.now() - CATCH_UP_WINDOW
+
+        for guild_id, offsets in self._offsets.items():
+            sent = self._sent[guild_id].get(key, set())
+            for offset in offsets:
+                due = datetime.combine(event_date - timedelta(days=offset), time(REMINDER_HOUR))
+                if due >= cutoff and offset not in sent:
+                    heapq.heappush(self._heap, (due, guild_id, key, offset))
+
+    def schedule_event(self, key: str, event: Dict[str, Any], event_date: date):
+        """Add reminders for a newly created event"""
+        self._events[key] = (event, event_date)
+        self._push_event(key)
+        self._wake.set()
+
+    def unschedule_event(self, key: str):
+        """Forget a deleted event; its heap entries are skipped when they come due"""
+        self._events.pop(key, None)
+        for sent in self._sent.values():
+            sent.pop(key, None)
+
+    async def set_offsets(self, guild_id: int, offsets: List[int]):
+        """Change a guild's reminder offsets and reschedule"""
+        await self.dm.update_guild_config(guild_id, reminder_offsets=offsets)
+        await self.rebuild()
+
+    async def _run(self):
+        """Sleep until the next reminder is due, deliver it, repeat"""
+        await self.bot.wait_until_ready()
+        await self.rebuild()
+
+        while True:
+            self._wake.clear()
+            now = datetime.now()
+
+            due = []
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap))
+            if due:
+                try:
+                    async with self._lock:
+                        await self._deliver_due(due)
+                except Exception as e:
+                    logger.error(f"Error sending reminders: {e}", exc_info=e)
+
+            timeout = MAX_SLEEP
+            if self._heap:
+                timeout = min(timeout, max(0.0, (self._heap[0][0] - datetime.now()).total_seconds()))
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _deliver_due(self, due: List[Tuple[datetime, int, str, int]]):
+        """Send due reminders grouped per guild and offset, then record them"""
+        batches: Dict[Tuple[int, int], List[str]] = {}
+        for _, guild_id, key, offset in due:
+            if key in self._events and offset not in self._sent.get(guild_id, {}).get(key, set()):
+                batches.setdefault((guild_id, offset), []).append(key)
+
+        for (guild_id, offset), keys in sorted(batches.items(), key=lambda b: -b[0][1]):
+            guild = self.bot.get_guild(guild_id)
+            if not guild:
+                continue
+
+            # One guild failing (missing permissions, a 5xx) must not hold back the others
+            try:
+                await self._deliver_batch(guild, offset, keys)
+            except Exception as e:
+                logger.error(f"Error sending {offset}-day reminders in guild {guild_id}: {e}", exc_info=e)
+
+    async def _deliver_batch(self, guild: discord.Guild, offset: int, keys: List[str]):
+        """Send one guild's reminders for one offset and record them as sent"""
+        events = [self._events[key][0] for key in keys]
+        if not await self.deliver(guild, offset, events):
+            return
+
+        sent = self._sent.setdefault(guild.id, {})
+        for key in keys:
+            sent.setdefault(key, set()).add(offset)
+
+        def record(config: Dict[str, Any]):
+            history = config.setdefault('sent_reminders', {})
+            for key in keys:
+                history[key] = sorted(set(history.get(key, [])) | {offset})
+
+        await self.dm.modify_guild_config(guild.id, record)
@@ -0,0 +1,244 @@
+import os
+import json
+import asyncio
+import discord
+from typing import Dict, List, Any, Optional, Union
+from utils.rate_limit import rate_limiter
+
+
+TEMPLATE_DIR = "templates"
+
+Target = Union[discord.Role, discord.Member]
+
+
+def load_template(name: str) -> Dict[str, Any]:
+    """Load a server layout from templates/<name>.json"""
+    with open(os.path.join(TEMPLATE_DIR, f"{name}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _color(value: Optional[str]) -> discord.Color:
+    """Parse a colour given as a discord.Color factory name or #rrggbb"""
+    if not value:
+        return discord.Color.default()
+    if value.startswith("#"):
+        return discord.Color(int(value[1:], 16))
+    return getattr(discord.Color, value)()
+
+
+class PlanStep:
+    """One change needed to make a guild match its template"""
+
+    def __init__(self, action: str, kind: str, name: str, spec: Dict[str, Any],
+                 category: str = None, target: Any = None, changes: List[str] = None):
+        self.action = action        # "create" or "update"
+        self.kind = kind            # "role", "category", "text" or "voice"
+        self.name = name
+        self.spec = spec
+        self.category = category    # Parent category name for channels
+        self.target = target        # Existing object for updates
+        self.changes = changes or []
+
+    def describe(self) -> str:
+        """Human readable line for the plan summary"""
+        icon = {"role": "🎭", "category": "📁", "text": "#", "voice": "🔊"}[self.kind]
+        where = f" in {self.category}" if self.category else ""
+        if self.action == "create":
+            return f"➕ {icon} {self.name}{where}"
+        return f"✏️ {icon} {self.name}{where} ({', '.join(self.changes)})"
+
+
+class ServerTemplate:
+    """Diffs a declarative layout against a guild and applies only what differs
+
+    Layouts list roles and categories of text/voice channels with topics and
+    permission overwrites keyed by role name ("@everyone" for the default
+    role). Channels without overwrites inherit their category's.
+    """
+
+    def __init__(self, guild: discord.Guild, template: Dict[str, Any]):
+        self.guild = guild
+        self.template = template
+        # Roles created by apply(), usable before the gateway adds them to the guild cache
+        self._created_roles: Dict[str, discord.Role] = {}
+
+    # ==================== RESOLUTION ====================
+
+    def _role(self, name: str) -> Optional[discord.Role]:
+        if name == "@everyone":
+            return self.guild.default_role
+        return self._created_roles.get(name) or discord.utils.get(self.guild.roles, name=name)
+
+    def _overwrites(self, spec: Dict[str, Dict[str, bool]]) -> Dict[Target, discord.PermissionOverwrite]:
+        """Build overwrites for the roles that exist"""
+        overwrites = {}
+        for role_name, perms in (spec or {}).items():
+            role = self._role(role_name)
+            if role:
+                overwrites[role] = discord.PermissionOverwrite(**perms)
+        return overwrites
+
+    def _channel_overwrites(self, category_spec: Dict[str, Any], spec: Dict[str, Any]) -> Optional[Dict[str, Dict[str, bool]]]:
+        """Overwrite spec for a channel: its category's plus its own, or None to inherit"""
+        if not spec.get('overwrites'):
+            return None
+        merged = {name: dict(perms) for name, perms in category_spec.get('overwrites', {}).items()}
+        for name, perms in spec['overwrites'].items():
+            merged.setdefault(name, {}).update(perms)
+        return merged
+
+    def _overwrites_differ(self, obj: discord.abc.GuildChannel, spec: Dict[str, Dict[str, bool]]) -> bool:
+        """Whether any role named in spec is missing or has different overwrites"""
+        for role_name, perms in spec.items():
+            role = self._role(role_name)
+            if role is None or obj.overwrites.get(role) != discord.PermissionOverwrite(**perms):
+                return True
+        return False
+
+    def _find_channel(self, category: Optional[discord.CategoryChannel], name: str, kind: str):
+        if category is None:
+            return None
+        channels = category.text_channels if kind == "text" else category.voice_channels
+        return discord.utils.get(channels, name=name)
+
+    # ==================== PLAN ====================
+
+    def plan(self) -> List[PlanStep]:
+        """List the creates and updates needed, without changing anything"""
+        steps = []
+
+        for spec in self.template.get('roles', []):
+            role = self._role(spec['name'])
+            if role is None:
+                steps.append(PlanStep("create", "role", spec['name'], spec))
+                continue
+
+            changes = []
+            required = discord.Permissions(**{perm: True for perm in spec.get('permissions', [])})
+            if not required.is_subset(role.permissions):
+                changes.append("permissions")
+            if 'color' in spec and role.color != _color(spec['color']):
+                changes.append("colour")
+            for flag in ("hoist", "mentionable"):
+                if flag in spec and getattr(role, flag) != spec[flag]:
+                    changes.append(flag)
+            if changes:
+                steps.append(PlanStep("update", "role", spec['name'], spec, target=role, changes=changes))
+
+        for cat_spec in self.template.get('categories', []):
+            category = discord.utils.get(self.guild.categories, name=cat_spec['name'])
+            if category is None:
+                steps.append(PlanStep("create", "category", cat_spec['name'], cat_spec))
+            elif self._overwrites_differ(category, cat_spec.get('overwrites', {})):
+                steps.append(PlanStep("update", "category", cat_spec['name'], cat_spec, target=category, changes=["permissions"]))
+
+            for spec in cat_spec.get('channels', []):
+                kind = spec.get('type', 'text')
+                channel = self._find_channel(category, spec['name'], kind)
+                if channel is None:
+                    steps.append(PlanStep("create", kind, spec['name'], spec, category=cat_spec['name']))
+                    continue
+
+                changes = []
+                if kind == "text" and (channel.topic or "") != spec.get('topic', ""):
+                    changes.append("topic")
+                overwrites = self._channel_overwrites(cat_spec, spec)
+                if overwrites and self._overwrites_differ(channel, overwrites):
+                    changes.append("permissions")
+                if changes:
+                    steps.append(PlanStep("update", kind, spec['name'], spec, category=cat_spec['name'], target=channel, changes=changes))
+
+        return steps
+
+    # ==================== APPLY ====================
+
+    async def apply(self, steps: List[PlanStep] = None) -> Dict[str, Any]:
+        """Apply a plan and return every templated role, category and channel by name
+
+        Roles go first since overwrites refer to them; then each category and
+        its channels form an independent branch, and all branches run at once
+        under the shared rate limiter.
+        """
+        steps = self.plan() if steps is None else steps
+        by_key = {(step.kind, step.category, step.name): step for step in steps}
+
+        await asyncio.gather(*(
+            self._apply_role(step) for step in steps if step.kind == "role"
+        ))
+
+        objects: Dict[str, Any] = {}
+        for spec in self.template.get('roles', []):
+            objects[spec['name']] = self._role(spec['name'])
+
+        await asyncio.gather(*(
+            self._apply_category(cat_spec, by_key, objects)
+            for cat_spec in self.template.get('categories', [])
+        ))
+        return objects
+
+    async def _apply_role(self, step: PlanStep):
+        spec = step.spec
+        required = discord.Permissions(**{perm: True for perm in spec.get('permissions', [])})
+        fields = {
+            'color': _color(spec.get('color')),
+            'hoist': spec.get('hoist', False),
+            'mentionable': spec.get('mentionable', False),
+            'reason': "Server template"
+        }
+        bucket = ("roles", self.guild.id)
+
+        if step.action == "create":
+            role = await rate_limiter.call(bucket, self.guild.create_role, name=spec['name'], permissions=required, **fields)
+            self._created_roles[spec['name']] = role
+        else:
+            await rate_limiter.call(bucket, step.target.edit, permissions=step.target.permissions | required, **fields)
+
+    async def _apply_category(self, cat_spec: Dict[str, Any], by_key: Dict[tuple, PlanStep], objects: Dict[str, Any]):
+        """Bring one category and its channels in line with the template"""
+        bucket = ("channels", self.guild.id)
+        overwrites = self._overwrites(cat_spec.get('overwrites'))
+
+        step = by_key.get(("category", None, cat_spec['name']))
+        category = discord.utils.get(self.guild.categories, name=cat_spec['name'])
+        if step and step.action == "create":
+            category = await rate_limiter.call(bucket, self.guild.create_category, cat_spec['name'], overwrites=overwrites, reason="Server template")
+        elif step:
+            await rate_limiter.call(bucket, category.edit, overwrites={**category.overwrites, **overwrites}, reason="Server template")
+        objects[cat_spec['name']] = category
+
+        async def apply_channel(position: int, spec: Dict[str, Any]):
+            kind = spec.get('type', 'text')
+            step = by_key.get((kind, cat_spec['name'], spec['name']))
+            channel = self._find_channel(category, spec['name'], kind)
+            overwrite_spec = self._channel_overwrites(cat_spec, spec)
+
+            if step and step.action == "create":
+                kwargs = {'category': category, 'position': position, 'reason': "Server template"}
+                if overwrite_spec:
+                    kwargs['overwrites'] = self._overwrites(overwrite_spec)
+                if kind == "text":
+                    channel = await rate_limiter.call(bucket, self.guild.create_text_channel, spec['name'], topic=spec.get('topic'), **kwargs)
+                else:
+                    channel = await rate_limiter.call(bucket, self.guild.create_voice_channel, spec['name'], **kwargs)
+            elif step:
+                kwargs = {'reason': "Server template"}
+                if "topic" in step.changes:
+                    kwargs['topic'] = spec.get('topic', "")
+                if "permissions" in step.changes:
+                    kwargs['overwrites'] = {**channel.overwrites, **self._overwrites(overwrite_spec)}
+                await rate_limiter.call(bucket, channel.edit, **kwargs)
+            objects[spec['name']] = channel
+
+        await asyncio.gather(*(
+            apply_channel(position, spec) for position, spec in enumerate(cat_spec.get('channels', []))
+        ))
+
+
+def format_plan(steps: List[PlanStep], limit: int = 25) -> str:
+    """Summarise a plan for an embed"""
+    if not steps:
+        return "Nothing to do - the server already matches the template."
+    lines = [step.describe() for step in steps[:limit]]
+    if len(steps) > limit:
+        lines.append(f"*...and {len(steps) - limit} more*")
+    return "\n".join(lines)
@@ -0,0 +1,593 @@
+import os
+import copy
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Callable, Union, Tuple
+from datetime import datetime, date as Date
+from utils.helpers import load_json, DATA_DIR
+from utils.data_manager import DataManager, parse_event_date
+
+OWNER = os.getenv("OWNER_USERNAME")
+SQLITE_PATH = os.getenv("SQLITE_PATH", f"{DATA_DIR}/unibot.db")
+
+
+def _date_column(date: str) -> str:
+    """Zero-padded ISO date for the events.date column, so text order is date order
+
+    Malformed dates are stored as given.
+    """
+    parsed = parse_event_date(date)
+    return parsed.isoformat() if parsed else date
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS admins (
+    username TEXT PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS admin_ids (
+    user_id INTEGER PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS modules (
+    code TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    module TEXT NOT NULL,
+    date TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_module_date ON events (module, date);
+CREATE INDEX IF NOT EXISTS idx_events_date ON events (date);
+
+CREATE TABLE IF NOT EXISTS guild_config (
+    guild_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (guild_id, key)
+);
+
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS user_modules (
+    user_id TEXT NOT NULL,
+    module TEXT NOT NULL,
+    PRIMARY KEY (user_id, module)
+);
+CREATE INDEX IF NOT EXISTS idx_user_modules_module ON user_modules (module);
+"""
+
+
+class SQLiteDataManager:
+    """SQLite-backed data management with the same API as DataManager"""
+
+    def __init__(self, path: str = None):
+        self.path = path or SQLITE_PATH
+        self._lock = threading.RLock()
+        self._ensure_db()
+
+    def _ensure_db(self):
+        """Open the database and create the schema"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+        with self._tx() as db:
+            has_admins = (
+                db.execute("SELECT 1 FROM admins LIMIT 1").fetchone()
+                or db.execute("SELECT 1 FROM admin_ids LIMIT 1").fetchone()
+            )
+            if OWNER and not has_admins:
+                db.execute("INSERT INTO admins (username) VALUES (?)", (OWNER,))
+
+            # Pad dates stored before the column was normalised, e.g. 2026-10-5
+            for row_id, date in db.execute("SELECT id, date FROM events WHERE length(date) != 10").fetchall():
+                if _date_column(date) != date:
+                    db.execute("UPDATE events SET date = ? WHERE id = ?", (_date_column(date), row_id))
+
+            # Keys migrated with a suffix above their row id would collide with new keys
+            highest = max(
+                (int(key.rsplit("::", 1)[-1]) for (key,) in db.execute("SELECT key FROM events")
+                 if key.rsplit("::", 1)[-1].isdigit()),
+                default=0
+            )
+            if db.execute("SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'events'").fetchone()[0] < highest:
+                db.execute("DELETE FROM sqlite_sequence WHERE name = 'events'")
+                db.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('events', ?)", (highest,))
+        self._index_admins()
+
+    @contextmanager
+    def _tx(self):
+        """Run statements in a single transaction"""
+        with self._lock, self._conn:
+            yield self._conn
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    # ==================== ADMINS ====================
+
+    # Admins are stored by user ID in admin_ids. Rows left in admins are legacy
+    # usernames, replaced by their ID the first time they use an admin command.
+
+    def _index_admins(self):
+        """Rebuild the in-memory admin ID and legacy username sets"""
+        with self._lock:
+            ids = self._conn.execute("SELECT user_id FROM admin_ids").fetchall()
+            names = self._conn.execute("SELECT username FROM admins").fetchall()
+        self._admin_ids = frozenset(row[0] for row in ids)
+        self._admin_names = frozenset(row[0] for row in names)
+
+    def get_admins(self) -> List[Union[int, str]]:
+        """Get list of bot admins (user IDs, plus any legacy usernames)"""
+        with self._lock:
+            ids = self._conn.execute("SELECT user_id FROM admin_ids ORDER BY rowid").fetchall()
+            names = self._conn.execute("SELECT username FROM admins ORDER BY rowid").fetchall()
+        return [row[0] for row in ids] + [row[0] for row in names]
+
+    def add_admin(self, user: Union[int, str]) -> bool:
+        """Add an admin by user ID"""
+        with self._tx() as db:
+            if isinstance(user, int):
+                cur = db.execute("INSERT OR IGNORE INTO admin_ids (user_id) VALUES (?)", (user,))
+            else:
+                cur = db.execute("INSERT OR IGNORE INTO admins (username) VALUES (?)", (user,))
+        self._index_admins()
+        return cur.rowcount > 0
+
+    def remove_admin(self, user: Union[int, str]) -> bool:
+        """Remove an admin (cannot remove owner)"""
+        if user == OWNER:
+            return False
+
+        with self._tx() as db:
+            if isinstance(user, int):
+                cur = db.execute("DELETE FROM admin_ids WHERE user_id = ?", (user,))
+            else:
+                cur = db.execute("DELETE FROM admins WHERE username = ?", (user,))
+        self._index_admins()
+        return cur.rowcount > 0
+
+    def is_admin(self, user_id: int) -> bool:
+        """Check if a user ID is an admin without touching the database"""
+        return user_id in self._admin_ids
+
+    def is_legacy_admin(self, username: str) -> bool:
+        """Check if a username is listed as an admin that has no ID yet"""
+        return username in self._admin_names
+
+    def migrate_admin(self, username: str, user_id: int) -> bool:
+        """Replace a legacy admin username with the user's ID"""
+        with self._tx() as db:
+            cur = db.execute("DELETE FROM admins WHERE username = ?", (username,))
+            if cur.rowcount:
+                db.execute("INSERT OR IGNORE INTO admin_ids (user_id) VALUES (?)", (user_id,))
+        self._index_admins()
+        return cur.rowcount > 0
+
+    # ==================== MODULES ====================
+
+    def get_modules(self) -> Dict[str, Any]:
+        """Get all modules"""
+        with self._lock:
+            rows = self._conn.execute("SELECT code, data FROM modules ORDER BY rowid").fetchall()
+        return {code: json.loads(data) for code, data in rows}
+
+    def get_module(self, code: str) -> Optional[Dict[str, Any]]:
+        """Get a specific module"""
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM modules WHERE code = ?", (code.upper(),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def add_module(self, code: str, data: Dict[str, Any] = None) -> bool:
+        """Add a new module"""
+        if data is None:
+            data = {}
+
+        data['created'] = str(datetime.utcnow())
+        with self._tx() as db:
+            cur = db.execute(
+                "INSERT OR IGNORE INTO modules (code, data) VALUES (?, ?)",
+                (code.upper(), json.dumps(data))
+            )
+        return cur.rowcount > 0
+
+    def add_modules(self, new_modules: Dict[str, Dict[str, Any]]) -> List[str]:
+        """Add several modules in one transaction and return the codes that were added"""
+        created = str(datetime.utcnow())
+        added = []
+        with self._tx() as db:
+            for code, data in new_modules.items():
+                cur = db.execute(
+                    "INSERT OR IGNORE INTO modules (code, data) VALUES (?, ?)",
+                    (code.upper(), json.dumps(dict(data or {}, created=created)))
+                )
+                if cur.rowcount > 0:
+                    added.append(code.upper())
+        return added
+
+    def remove_module(self, code: str) -> bool:
+        """Remove a module"""
+        with self._tx() as db:
+            cur = db.execute("DELETE FROM modules WHERE code = ?", (code.upper(),))
+        return cur.rowcount > 0
+
+    def remove_modules(self, codes: List[str]) -> List[str]:
+        """Remove several modules in one transaction and return the codes that were removed"""
+        removed = []
+        with self._tx() as db:
+            for code in codes:
+                cur = db.execute("DELETE FROM modules WHERE code = ?", (code.upper(),))
+                if cur.rowcount > 0:
+                    removed.append(code.upper())
+        return removed
+
+    def update_module(self, code: str, data: Dict[str, Any]) -> bool:
+        """Update module data"""
+        code = code.upper()
+
+        with self._tx() as db:
+            row = db.execute("SELECT data FROM modules WHERE code = ?", (code,)).fetchone()
+            if not row:
+                return False
+
+            module = json.loads(row[0])
+            module.update(data)
+            db.execute("UPDATE modules SET data = ? WHERE code = ?", (json.dumps(module), code))
+        return True
+
+    def module_exists(self, code: str) -> bool:
+        """Check if module exists"""
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM modules WHERE code = ?", (code.upper(),)).fetchone()
+        return row is not None
+
+    # ==================== EVENTS ====================
+
+    def get_events(self, module: str = None) -> Dict[str, Any]:
+        """Get all events or events for a specific module"""
+        with self._lock:
+            if module:
+                rows = self._conn.execute(
+                    "SELECT key, data FROM events WHERE module = ? ORDER BY id",
+                    (module.upper(),)
+                ).fetchall()
+            else:
+                rows = self._conn.execute("SELECT key, data FROM events ORDER BY id").fetchall()
+        return {key: json.loads(data) for key, data in rows}
+
+    def get_events_sorted(self, module: str = None) -> List[Tuple[str, Dict[str, Any], Optional[Date]]]:
+        """Get (key, event, date) for all or one module's events in date order
+
+        Events with a malformed date come last with a date of None.
+        """
+        with self._lock:
+            if module:
+                rows = self._conn.execute(
+                    "SELECT key, data, date FROM events WHERE module = ? ORDER BY date, id",
+                    (module.upper(),)
+                ).fetchall()
+            else:
+                rows = self._conn.execute("SELECT key, data, date FROM events ORDER BY date, id").fetchall()
+
+        events = [(key, json.loads(data), parse_event_date(date)) for key, data, date in rows]
+        return [e for e in events if e[2] is not None] + [e for e in events if e[2] is None]
+
+    def get_events_between(self, start: Date, end: Date) -> List[Tuple[str, Dict[str, Any], Date]]:
+        """Get (key, event, date) for events dated from start to end inclusive, in date order"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, data, date FROM events WHERE date BETWEEN ? AND ? ORDER BY date, id",
+                (start.isoformat(), end.isoformat())
+            ).fetchall()
+
+        events = [(key, json.loads(data), parse_event_date(date)) for key, data, date in rows]
+        return [e for e in events if e[2] is not None]
+
+    def add_event(self, module: str, date: str, description: str, **kwargs) -> str:
+        """Add an event and return its key"""
+        module = module.upper()
+        event = {
+            'module': module,
+            'date': date,
+            'description': description,
+            'created': str(datetime.utcnow()),
+            **kwargs
+        }
+
+        with self._tx() as db:
+            cur = db.execute(
+                "INSERT INTO events (key, module, date, data) VALUES (?, ?, ?, ?)",
+                (f"{module}::{date}::pending", module, _date_column(date), json.dumps(event))
+            )
+            key = f"{module}::{date}::{cur.lastrowid}"
+            db.execute("UPDATE events SET key = ? WHERE id = ?", (key, cur.lastrowid))
+        return key
+
+    def remove_event(self, key: str) -> bool:
+        """Remove an event by key"""
+        with self._tx() as db:
+            cur = db.execute("DELETE FROM events WHERE key = ?", (key,))
+        return cur.rowcount > 0
+
+    def find_event(self, module: str, date: str) -> Optional[str]:
+        """Find event key by module and date"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key FROM events WHERE module = ? AND date = ? ORDER BY id LIMIT 1",
+                (module.upper(), _date_column(date))
+            ).fetchone()
+        return row[0] if row else None
+
+    # ==================== GUILD CONFIG ====================
+
+    def get_guild_config(self, guild_id: int) -> Dict[str, Any]:
+        """Get configuration for a guild"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM guild_config WHERE guild_id = ?",
+                (str(guild_id),)
+            ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def set_guild_config(self, guild_id: int, key: str, value: Any) -> bool:
+        """Set a configuration value for a guild"""
+        with self._tx() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO guild_config (guild_id, key, value) VALUES (?, ?, ?)",
+                (str(guild_id), key, json.dumps(value))
+            )
+        return True
+
+    def get_guild_config_value(self, guild_id: int, key: str, default: Any = None) -> Any:
+        """Get a specific config value for a guild"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM guild_config WHERE guild_id = ? AND key = ?",
+                (str(guild_id), key)
+            ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    @contextmanager
+    def transaction(self, guild_id: int):
+        """Edit a guild's config in place and save every change in one transaction
+
+        Nothing is saved if the block raises.
+        """
+        with self._tx() as db:
+            rows = db.execute(
+                "SELECT key, value FROM guild_config WHERE guild_id = ?",
+                (str(guild_id),)
+            ).fetchall()
+            before = {key: json.loads(value) for key, value in rows}
+            config = copy.deepcopy(before)
+
+            yield config
+
+            db.executemany(
+                "INSERT OR REPLACE INTO guild_config (guild_id, key, value) VALUES (?, ?, ?)",
+                [
+                    (str(guild_id), key, json.dumps(value))
+                    for key, value in config.items()
+                    if key not in before or before[key] != value
+                ]
+            )
+            db.executemany(
+                "DELETE FROM guild_config WHERE guild_id = ? AND key = ?",
+                [(str(guild_id), key) for key in before if key not in config]
+            )
+
+    def update_guild_config(self, guild_id: int, **changes: Any) -> bool:
+        """Set several configuration values for a guild in one transaction"""
+        with self._tx() as db:
+            db.executemany(
+                "INSERT OR REPLACE INTO guild_config (guild_id, key, value) VALUES (?, ?, ?)",
+                [(str(guild_id), key, json.dumps(value)) for key, value in changes.items()]
+            )
+        return True
+
+    def modify_guild_config(self, guild_id: int, func: Callable[[Dict[str, Any]], Any]) -> Any:
+        """Apply func to a guild's config atomically and return its result"""
+        with self.transaction(guild_id) as config:
+            return func(config)
+
+    # ==================== USER STATS ====================
+
+    def _load_user_stats(self, db: sqlite3.Connection, user_id: str) -> Dict[str, Any]:
+        """Load a user's stats row, excluding module memberships"""
+        row = db.execute("SELECT data FROM user_stats WHERE user_id = ?", (user_id,)).fetchone()
+        if row:
+            return json.loads(row[0])
+        return {
+            'messages': 0,
+            'commands_used': 0,
+            'joined_at': None
+        }
+
+    def _save_user_stats(self, db: sqlite3.Connection, user_id: str, stats: Dict[str, Any]):
+        """Save a user's stats row"""
+        stats = {k: v for k, v in stats.items() if k != 'modules'}
+        db.execute(
+            "INSERT OR REPLACE INTO user_stats (user_id, data) VALUES (?, ?)",
+            (user_id, json.dumps(stats))
+        )
+
+    def get_user_stats(self, user_id: int) -> Dict[str, Any]:
+        """Get stats for a user"""
+        with self._lock:
+            stats = self._load_user_stats(self._conn, str(user_id))
+            rows = self._conn.execute(
+                "SELECT module FROM user_modules WHERE user_id = ? ORDER BY rowid",
+                (str(user_id),)
+            ).fetchall()
+        stats['modules'] = [row[0] for row in rows]
+        return stats
+
+    def update_user_stat(self, user_id: int, key: str, value: Any) -> bool:
+        """Update a user stat"""
+        if key == 'modules':
+            with self._tx() as db:
+                db.execute("DELETE FROM user_modules WHERE user_id = ?", (str(user_id),))
+                db.executemany(
+                    "INSERT OR IGNORE INTO user_modules (user_id, module) VALUES (?, ?)",
+                    [(str(user_id), module) for module in value]
+                )
+            return True
+
+        with self._tx() as db:
+            stats = self._load_user_stats(db, str(user_id))
+            stats[key] = value
+            self._save_user_stats(db, str(user_id), stats)
+        return True
+
+    def increment_user_stat(self, user_id: int, key: str, amount: int = 1) -> bool:
+        """Increment a numeric user stat"""
+        with self._tx() as db:
+            stats = self._load_user_stats(db, str(user_id))
+            stats[key] = stats.get(key, 0) + amount
+            self._save_user_stats(db, str(user_id), stats)
+        return True
+
+    def add_user_module(self, user_id: int, module: str) -> bool:
+        """Add a module to user's list"""
+        with self._tx() as db:
+            cur = db.execute(
+                "INSERT OR IGNORE INTO user_modules (user_id, module) VALUES (?, ?)",
+                (str(user_id), module.upper())
+            )
+        return cur.rowcount > 0
+
+    def remove_user_module(self, user_id: int, module: str) -> bool:
+        """Remove a module from user's list"""
+        with self._tx() as db:
+            cur = db.execute(
+                "DELETE FROM user_modules WHERE user_id = ? AND module = ?",
+                (str(user_id), module.upper())
+            )
+        return cur.rowcount > 0
+
+    def update_user_modules(self, user_id: int, add: List[str], remove: List[str]) -> bool:
+        """Add and remove modules from a user's list in one transaction"""
+        with self._tx() as db:
+            db.executemany(
+                "DELETE FROM user_modules WHERE user_id = ? AND module = ?",
+                [(str(user_id), module.upper()) for module in remove]
+            )
+            db.executemany(
+                "INSERT OR IGNORE INTO user_modules (user_id, module) VALUES (?, ?)",
+                [(str(user_id), module.upper()) for module in add]
+            )
+        return True
+
+    def purge_user_modules(self, modules: List[str]) -> int:
+        """Remove modules from every user's list and return how many users changed"""
+        modules = [module.upper() for module in modules]
+        if not modules:
+            return 0
+
+        placeholders = ", ".join("?" * len(modules))
+        with self._tx() as db:
+            changed = db.execute(
+                f"SELECT COUNT(DISTINCT user_id) FROM user_modules WHERE module IN ({placeholders})",
+                modules
+            ).fetchone()[0]
+            db.execute(f"DELETE FROM user_modules WHERE module IN ({placeholders})", modules)
+        return changed
+
+
+def migrate_from_json(path: str = None) -> Dict[str, int]:
+    """Copy the JSON data files into the SQLite database and return row counts"""
+
+    manager = SQLiteDataManager(path)
+    counts = {}
+
+    with manager._tx() as db:
+        admins = load_json(DataManager.ADMINS_FILE, [OWNER] if OWNER else [])
+        db.executemany(
+            "INSERT OR IGNORE INTO admin_ids (user_id) VALUES (?)",
+            [(user_id,) for user_id in admins if isinstance(user_id, int)]
+        )
+        db.executemany(
+            "INSERT OR IGNORE INTO admins (username) VALUES (?)",
+            [(username,) for username in admins if isinstance(username, str) and username]
+        )
+        counts['admins'] = len(admins)
+
+        modules = load_json(DataManager.MODULES_FILE, {})
+        db.executemany(
+            "INSERT OR REPLACE INTO modules (code, data) VALUES (?, ?)",
+            [(code.upper(), json.dumps(data)) for code, data in modules.items()]
+        )
+        counts['modules'] = len(modules)
+
+        events = load_json(DataManager.EVENTS_FILE, {})
+        # Keep each key's numeric suffix as its row id so AUTOINCREMENT continues past it
+        # and new keys ({module}::{date}::{id}) never collide with migrated ones
+        explicit, automatic, used = [], [], set()
+        for key, event in events.items():
+            suffix = key.rsplit("::", 1)[-1]
+            row = (key, event.get('module', ''), _date_column(event.get('date', '')), json.dumps(event))
+            if suffix.isdigit() and int(suffix) > 0 and int(suffix) not in used:
+                used.add(int(suffix))
+                explicit.append((int(suffix),) + row)
+            else:
+                automatic.append(row)
+        db.executemany(
+            "INSERT OR REPLACE INTO events (id, key, module, date, data) VALUES (?, ?, ?, ?, ?)",
+            explicit
+        )
+        db.executemany(
+            "INSERT OR REPLACE INTO events (key, module, date, data) VALUES (?, ?, ?, ?)",
+            automatic
+        )
+        counts['events'] = len(events)
+
+        configs = load_json(DataManager.GUILD_CONFIG_FILE, {})
+        db.executemany(
+            "INSERT OR REPLACE INTO guild_config (guild_id, key, value) VALUES (?, ?, ?)",
+            [
+                (guild_id, key, json.dumps(value))
+                for guild_id, config in configs.items()
+                for key, value in config.items()
+            ]
+        )
+        counts['guild_config'] = len(configs)
+
+        stats = load_json(DataManager.USER_STATS_FILE, {})
+        for user_id, user_stats in stats.items():
+            manager._save_user_stats(db, user_id, user_stats)
+            db.executemany(
+                "INSERT OR IGNORE INTO user_modules (user_id, module) VALUES (?, ?)",
+                [(user_id, module.upper()) for module in user_stats.get('modules', [])]
+            )
+        counts['user_stats'] = len(stats)
+
+    manager.close()
+    return counts
+
+
+def main():
+    """One-shot migration: python -m utils.sqlite_manager"""
+    from dotenv import load_dotenv
+    load_dotenv()
+    # SQLITE_PATH and OWNER_USERNAME are read at import, so import the migrator
+    # afresh now that .env is loaded instead of using this __main__ copy
+    from utils.sqlite_manager import migrate_from_json
+    for table, count in migrate_from_json().items():
+        print(f"Migrated {count} {table} entries")
+
+
+if __name__ == "__main__":
+    main()
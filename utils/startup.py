@@ -0,0 +1,52 @@
+import time
+from typing import Dict, List
+
+
+class StartupReport:
+    """Times each phase between creating the bot and its first on_ready
+
+    Phases are recorded in order, each measured from the end of the previous
+    one, so they add up to the total time to ready.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        # extension -> {"import": seconds, "setup": seconds}
+        self.extensions: Dict[str, Dict[str, float]] = {}
+        self.failed: Dict[str, str] = {}
+        self.ready = False
+        self._checkpoint = time.perf_counter()
+
+    def phase(self, name: str):
+        """End the current phase under the given name"""
+        now = time.perf_counter()
+        self.phases[name] = now - self._checkpoint
+        self._checkpoint = now
+
+    def extensions_loaded(self):
+        """End the extension loading phase, split into import and cog setup
+
+        Imports run synchronously and never overlap, so their sum is wall time;
+        the rest of the phase is cog setup, which runs concurrently.
+        """
+        now = time.perf_counter()
+        imports = sum(timing.get('import', 0) for timing in self.extensions.values())
+        self.phases['import'] = imports
+        self.phases['cog setup'] = max(now - self._checkpoint - imports, 0)
+        self._checkpoint = now
+
+    @property
+    def total(self) -> float:
+        """Seconds across all recorded phases"""
+        return sum(self.phases.values())
+
+    def summary(self) -> List[str]:
+        """Report lines: phases in order, then extensions slowest first"""
+        lines = [f"{name}: {seconds:.2f}s" for name, seconds in self.phases.items()]
+        lines.append(f"total: {self.total:.2f}s")
+        slowest = sorted(self.extensions.items(), key=lambda item: -sum(item[1].values()))
+        for name, timing in slowest:
+            lines.append(f"{name}: import {timing.get('import', 0):.2f}s, setup {timing.get('setup', 0):.2f}s")
+        for name, error in self.failed.items():
+            lines.append(f"{name}: failed ({error})")
+        return lines